@@ -1,16 +1,77 @@
-import tkinter as tk
-from tkinter import filedialog, messagebox
-import pandas as pd
+import importlib
 import json
+import math
+import hashlib
+import io
 import os
 import shutil
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-import numpy as np
+import signal
 from fpdf import FPDF
-from PIL import Image, ImageTk
+try:
+    from fpdf.php import sprintf
+except ImportError:  # fpdf2: não tem os internos do 1.7.2 usados por PDFIncremental
+    sprintf = None
+from PIL import Image
 import sys
+import multiprocessing
 import tempfile
+import zlib
+import time
+import threading
+import queue
+import uuid
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import itertools
+from contextlib import ExitStack, contextmanager, nullcontext
+from itertools import repeat
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+class _ModuloAdiado:
+    """Módulo importado só no primeiro acesso a um atributo.
+
+    pandas, numpy, openpyxl e matplotlib somam mais de um segundo de importação;
+    adiados, a janela abre sem esperar por eles (ver carregar_modulos). O
+    tkinter também é adiado, para que a linha de comando e o serviço rodem em
+    servidores sem o Tk instalado.
+    """
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def carregar(self):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self.carregar(), atributo)
+
+# Backend sem janelas: as figuras só são gravadas em arquivo, nunca exibidas
+os.environ.setdefault("MPLBACKEND", "Agg")
+pd = _ModuloAdiado("pandas")
+openpyxl = _ModuloAdiado("openpyxl")
+np = _ModuloAdiado("numpy")
+matplotlib = _ModuloAdiado("matplotlib")
+patches = _ModuloAdiado("matplotlib.patches")
+mcollections = _ModuloAdiado("matplotlib.collections")
+mfigure = _ModuloAdiado("matplotlib.figure")
+tk = _ModuloAdiado("tkinter")
+filedialog = _ModuloAdiado("tkinter.filedialog")
+messagebox = _ModuloAdiado("tkinter.messagebox")
+ttk = _ModuloAdiado("tkinter.ttk")
+ImageTk = _ModuloAdiado("PIL.ImageTk")
+
+def carregar_modulos():
+    """Importa de uma vez os módulos adiados; a interface chama em segundo plano."""
+    for modulo in (np, pd, openpyxl, matplotlib, patches, mcollections, mfigure):
+        modulo.carregar()
 
 def resource_path(relative_path):
     """Converte caminhos relativos em absolutos para o executável ou desenvolvimento."""
@@ -31,69 +92,284 @@ def calcular_momento_total(cargas_p, cargas_d):
         d["intensidade"] * (d["fim"] - d["inicio"]) * ((d["fim"] + d["inicio"]) / 2) for d in cargas_d
     )
 
-def calcular_reacoes_viga_continua(carga_total, apoios):
-    num = len(apoios)
-    return [carga_total / num for _ in apoios]
-
-def plotar_viga(comprimento, cargas_pontuais, cargas_distribuidas, pos_apoios):
-    fig, ax = plt.subplots(figsize=(10, 3))
-
-    altura_viga = 0.2
-    y_viga = 0.0
-
-    # Desenhar viga
-    viga = patches.Rectangle((0, y_viga - altura_viga / 2), comprimento, altura_viga,
-                            linewidth=1.5, edgecolor='black', facecolor='lightgrey', zorder=1)
-    ax.add_patch(viga)
-
-    # Desenhar apoios (triângulo apontando para baixo)
-    for i, x in enumerate(pos_apoios):
-        triangulo = patches.RegularPolygon((x, y_viga - 0.3), numVertices=3, radius=0.15,
-                                        orientation=0, facecolor='black', zorder=2)
-        ax.add_patch(triangulo)
-        ax.text(x, y_viga - 0.5, f'Apoio {i+1}', ha='center', va='top', fontsize=9)
-
-    # Cargas pontuais
-    for pos, valor in cargas_pontuais:
-        y_seta = y_viga + 0.3
-        ax.arrow(pos, y_seta + 0.3, 0, -0.3, head_width=0.15 * (comprimento/10), head_length=0.15,
-                fc='red', ec='red', linewidth=2, zorder=3)
-        ax.text(pos, y_seta + 0.45, f'{valor:.2f} kN', ha='center', color='red', fontsize=9, weight='bold')
-
-    # Cargas distribuídas (flechas acima da viga)
-    for inicio, fim, intensidade in cargas_distribuidas:
-        y_dist_base = y_viga + 0.3
-        altura_dist = 0.3
-        # Retângulo representando a carga
-        carga_rect = patches.Rectangle((inicio, y_dist_base), fim - inicio, altura_dist,
-                                    linewidth=0, facecolor='blue', alpha=0.2, zorder=2)
-        ax.add_patch(carga_rect)
-
-        # Setas indicando a carga (apontando para baixo, acima da viga)
-        num_setas = int((fim - inicio) * 4) + 2
-        xs = np.linspace(inicio, fim, num_setas)
-        y_topo_seta = y_dist_base + altura_dist
-        for x in xs:
-            ax.arrow(x, y_topo_seta, 0, -altura_dist, head_width=0.08 * (comprimento/10),
-                    head_length=0.1, fc='blue', ec='blue', linewidth=1, zorder=3)
-        ax.text((inicio + fim) / 2, y_topo_seta + 0.15, f'{intensidade:.2f} kN/m',
-                ha='center', color='blue', fontsize=9, weight='bold')
-
-    # Reta graduada
-    y_graduacao = y_viga - 0.75
-    ax.hlines(y=y_graduacao, xmin=0, xmax=comprimento, colors='black', linewidth=1)
-    marcacoes = np.linspace(0, comprimento, int(comprimento) + 1)
-    for x_mark in marcacoes:
-        ax.vlines(x=x_mark, ymin=y_graduacao - 0.05, ymax=y_graduacao + 0.05, colors='black', linewidth=1)
-        ax.text(x_mark, y_graduacao - 0.15, f'{x_mark:.1f}m', ha='center', va='top', fontsize=8)
-
-    # Ajustes finais
-    ax.set_xlim(-0.5, comprimento + 0.5)
-    ax.set_ylim(y_graduacao - 0.4, y_viga + 1.2)
-    ax.set_title("Diagrama da Viga e Carregamentos", fontsize=14, pad=20)
-    ax.set_xlabel("Posição (m)", fontsize=10) # Adicionado rótulo do eixo X
-    ax.axis('off') # Mantém os eixos ocultos, mas o xlabel ainda funciona
-    
+def _resolver_tridiagonal(inferior, diagonal, superior, termos):
+    """Algoritmo de Thomas: resolve um sistema tridiagonal em O(n)."""
+    n = len(diagonal)
+    c = [0.0] * n
+    d = [0.0] * n
+    c[0] = superior[0] / diagonal[0] if n > 1 else 0.0
+    d[0] = termos[0] / diagonal[0]
+    for i in range(1, n):
+        pivo = diagonal[i] - inferior[i] * c[i - 1]
+        if i < n - 1:
+            c[i] = superior[i] / pivo
+        d[i] = (termos[i] - inferior[i] * d[i - 1]) / pivo
+    x = [0.0] * n
+    x[-1] = d[-1]
+    for i in range(n - 2, -1, -1):
+        x[i] = d[i] - c[i] * x[i + 1]
+    return x
+
+def _termo_tres_momentos(w, s1, s2, l):
+    # Integral de w*s*(l² - s²)/l entre s1 e s2 (s medido a partir do apoio oposto)
+    return w / l * (l**2 * (s2**2 - s1**2) / 2 - (s2**4 - s1**4) / 4)
+
+def calcular_reacoes_viga_continua(apoios, cargas_p, cargas_d):
+    """Reações de uma viga contínua (EI constante) pela equação dos três momentos.
+
+    Os momentos nos apoios extremos vêm dos balanços; os momentos nos apoios
+    internos saem de um sistema tridiagonal, resolvido em tempo linear no
+    número de vãos. A convenção de sinais é a de momento_fletor.
+    """
+    n = len(apoios)
+    if any(apoios[i + 1] <= apoios[i] for i in range(n - 1)):
+        raise ValueError("Os apoios da viga contínua devem estar em ordem crescente e em posições distintas.")
+    vaos = [apoios[i + 1] - apoios[i] for i in range(n - 1)]
+
+    # Por vão: reação isostática à esquerda, carga total e termos de carga da
+    # equação dos três momentos (distância ao apoio esquerdo e ao direito).
+    r_esq = [0.0] * (n - 1)
+    carga_vao = [0.0] * (n - 1)
+    termo_esq = [0.0] * (n - 1)
+    termo_dir = [0.0] * (n - 1)
+    carga_balanco = [0.0, 0.0]
+    momento_balanco = [0.0, 0.0]
+
+    def aplicar(resultante, centro, trecho):
+        # trecho = (x1, x2, w) para carga distribuída ou None para carga pontual
+        if centro < apoios[0]:
+            carga_balanco[0] += resultante
+            momento_balanco[0] -= resultante * (apoios[0] - centro)
+            return
+        if centro > apoios[-1]:
+            carga_balanco[1] += resultante
+            momento_balanco[1] -= resultante * (centro - apoios[-1])
+            return
+        k = min(bisect_right(apoios, centro) - 1, n - 2)
+        l = vaos[k]
+        s = centro - apoios[k]
+        carga_vao[k] += resultante
+        r_esq[k] += resultante * (l - s) / l
+        if trecho is None:
+            termo_esq[k] += resultante * s * (l**2 - s**2) / l
+            termo_dir[k] += resultante * (l - s) * (l**2 - (l - s)**2) / l
+        else:
+            x1, x2, w = trecho
+            s1, s2 = x1 - apoios[k], x2 - apoios[k]
+            termo_esq[k] += _termo_tres_momentos(w, s1, s2, l)
+            termo_dir[k] += _termo_tres_momentos(w, l - s2, l - s1, l)
+
+    for c in cargas_p:
+        aplicar(c["valor"], c["pos"], None)
+
+    # Cargas distribuídas são divididas nos apoios para que cada trecho fique
+    # inteiramente dentro de um vão ou de um balanço.
+    limites = [0.0] + list(apoios) + [float("inf")]
+    for c in cargas_d:
+        x1, x2, w = c["inicio"], c["fim"], c["intensidade"]
+        for j in range(bisect_right(limites, x1) - 1, min(bisect_left(limites, x2), len(limites) - 1)):
+            a, b = max(x1, limites[j]), min(x2, limites[j + 1])
+            if b > a:
+                aplicar(w * (b - a), (a + b) / 2, (a, b, w))
+
+    momentos = [0.0] * n
+    momentos[0] = momento_balanco[0]
+    momentos[-1] = momento_balanco[1]
+    if n > 2:
+        inferior, diagonal, superior, termos = [], [], [], []
+        for i in range(1, n - 1):
+            inferior.append(vaos[i - 1])
+            diagonal.append(2 * (vaos[i - 1] + vaos[i]))
+            superior.append(vaos[i])
+            termos.append(-(termo_esq[i - 1] + termo_dir[i]))
+        termos[0] -= vaos[0] * momentos[0]
+        termos[-1] -= vaos[-1] * momentos[-1]
+        momentos[1:-1] = _resolver_tridiagonal(inferior, diagonal, superior, termos)
+
+    reacoes = [0.0] * n
+    reacoes[0] += carga_balanco[0]
+    reacoes[-1] += carga_balanco[1]
+    for k in range(n - 1):
+        cortante_esq = r_esq[k] + (momentos[k + 1] - momentos[k]) / vaos[k]
+        reacoes[k] += cortante_esq
+        reacoes[k + 1] += carga_vao[k] - cortante_esq
+    return reacoes
+
+# Formatos das figuras rasterizadas e a extensão de cada um. O PNG do matplotlib
+# (RGBA) é o padrão; o PNG indexado (paleta de 256 cores) e o JPEG deixam o PDF
+# menor e mais rápido de montar, ao custo de alguma fidelidade nas bordas.
+FORMATOS_IMAGEM = {"png": ".png", "png-indexado": ".png", "jpeg": ".jpg"}
+QUALIDADE_JPEG = 85
+
+def opcoes_imagem(formato="png", dpi=None, qualidade=QUALIDADE_JPEG):
+    """Opções de gravação das figuras; None quando iguais ao padrão (PNG do matplotlib a 100 dpi)."""
+    if formato not in FORMATOS_IMAGEM:
+        raise ValueError(f"Formato de imagem desconhecido: {formato}")
+    if formato == "png" and dpi is None:
+        return None
+    opcoes = {"formato": formato, "dpi": dpi}
+    if formato == "jpeg":
+        opcoes["qualidade"] = qualidade
+    return opcoes
+
+def salvar_figura(fig, caminho, imagem=None, **kwargs):
+    """savefig com as opções de opcoes_imagem; kwargs seguem para o savefig."""
+    imagem = imagem or {}
+    formato = imagem.get("formato", "png")
+    dpi = imagem.get("dpi") or "figure"
+    if formato == "png":
+        fig.savefig(caminho, dpi=dpi, **kwargs)
+        return
+    # PNG intermediário sem compressão: só é lido de volta pelo PIL
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, pil_kwargs={"compress_level": 0}, **kwargs)
+    buffer.seek(0)
+    with Image.open(buffer) as figura:
+        # O fundo das figuras é opaco: o canal alfa só custaria uma máscara a mais no PDF
+        rgb = figura.convert("RGB")
+    if formato == "jpeg":
+        rgb.save(caminho, "JPEG", quality=imagem.get("qualidade", QUALIDADE_JPEG), optimize=True)
+    else:
+        rgb.quantize(colors=256).save(caminho, "PNG")
+
+class RenderizadorVigas:
+    """Figuras do matplotlib criadas uma vez e reaproveitadas a cada viga.
+
+    Em vez de montar três figuras novas por viga, só os dados, limites e textos
+    mudam entre uma viga e outra. Setas, apoios e marcas da reta graduada são
+    desenhados como uma coleção por tipo, e não um artista para cada.
+    """
+    ALTURA_VIGA = 0.2
+    Y_VIGA = 0.0
+    Y_GRADUACAO = Y_VIGA - 0.75
+    Y_CARGA = Y_VIGA + 0.3
+    ALTURA_CARGA = 0.3
+
+    def __init__(self):
+        self.margens_padrao = {k: matplotlib.rcParams[f"figure.subplot.{k}"] for k in ("left", "right", "bottom", "top")}
+        # Figure direto, fora do pyplot: não abre janelas nem depende do backend ativo
+        self.fig_esquema = mfigure.Figure(figsize=(10, 3))
+        ax = self.ax_esquema = self.fig_esquema.add_subplot()
+        self.viga = ax.add_patch(patches.Rectangle((0, self.Y_VIGA - self.ALTURA_VIGA / 2), 1, self.ALTURA_VIGA,
+                                                   linewidth=1.5, edgecolor='black', facecolor='lightgrey', zorder=1))
+        self.apoios = ax.add_collection(mcollections.PolyCollection([], facecolor='black', edgecolor='none', zorder=2))
+        self.setas_pontuais = ax.add_collection(mcollections.PolyCollection([], facecolor='red', edgecolor='red', linewidth=2,
+                                                               joinstyle='miter', zorder=3))
+        self.faixas_distribuidas = ax.add_collection(mcollections.PolyCollection([], facecolor='blue', edgecolor='none',
+                                                                    alpha=0.2, zorder=2))
+        self.setas_distribuidas = ax.add_collection(mcollections.PolyCollection([], facecolor='blue', edgecolor='blue', linewidth=1,
+                                                                   joinstyle='miter', zorder=3))
+        self.graduacao = ax.hlines(y=self.Y_GRADUACAO, xmin=0, xmax=1, colors='black', linewidth=1)
+        self.marcas = ax.vlines(x=[], ymin=self.Y_GRADUACAO - 0.05, ymax=self.Y_GRADUACAO + 0.05,
+                                colors='black', linewidth=1)
+        ax.set_title("Diagrama da Viga e Carregamentos", fontsize=14, pad=20)
+        ax.set_xlabel("Posição (m)", fontsize=10)
+        ax.axis('off')
+        self.textos = []
+
+        self.cortante = self._criar_diagrama("Força Cortante", "Força Cortante (kN)", "C0")
+        self.momento = self._criar_diagrama("Momento Fletor", "Momento Fletor (kNm)", "orange")
+
+    @staticmethod
+    def _criar_diagrama(titulo, rotulo_y, cor):
+        # Linha do diagrama; linha_min e faixa só aparecem nas envoltórias
+        fig = mfigure.Figure(figsize=(8, 3))
+        ax = fig.add_subplot()
+        linha, = ax.plot([], [], label=titulo, color=cor)
+        linha_min, = ax.plot([], [], color=cor)
+        faixa = ax.add_collection(mcollections.PolyCollection([], facecolor=cor, edgecolor='none', alpha=0.2))
+        ax.axhline(0, color="black", lw=0.7)
+        ax.set_xlabel("Posição (m)", fontsize=10)
+        ax.set_ylabel(rotulo_y, fontsize=10)
+        return {"titulo": titulo, "linha": linha, "linha_min": linha_min, "faixa": faixa}
+
+    @staticmethod
+    def _setas(xs, y, comprimento, largura_ponta, altura_ponta):
+        # Todas as setas de um grupo têm o mesmo formato: o polígono de uma FancyArrow deslocado em x.
+        # Na coleção o antisserrilhado das pontas cai meio pixel diferente do de uma FancyArrow solta:
+        # as setas das cargas pontuais diferem em algumas dezenas de pixels, sem mudança visível.
+        modelo = patches.FancyArrow(0, y, 0, -comprimento, head_width=largura_ponta, head_length=altura_ponta).get_xy()
+        return modelo[None, :, :] + np.column_stack([xs, np.zeros(len(xs))])[:, None, :]
+
+    def _texto(self, *args, **kwargs):
+        self.textos.append(self.ax_esquema.text(*args, **kwargs))
+
+    def salvar_esquema(self, caminho, comprimento, cargas_pontuais, cargas_distribuidas, pos_apoios, imagem=None):
+        for texto in self.textos:
+            texto.remove()
+        self.textos = []
+        y_viga = self.Y_VIGA
+
+        self.viga.set_width(comprimento)
+
+        # Apoios: triângulos de raio 0.15, como RegularPolygon de 3 vértices e orientação 0
+        angulos = np.pi / 2 + 2 * np.pi * np.arange(3) / 3
+        triangulo = 0.15 * np.column_stack([np.cos(angulos), np.sin(angulos)])
+        self.apoios.set_verts([triangulo + (x, y_viga - 0.3) for x in pos_apoios])
+        for i, x in enumerate(pos_apoios):
+            self._texto(x, y_viga - 0.5, f'Apoio {i+1}', ha='center', va='top', fontsize=9)
+
+        posicoes = [pos for pos, _ in cargas_pontuais]
+        self.setas_pontuais.set_verts(self._setas(posicoes, self.Y_CARGA + 0.3, 0.3, 0.15 * (comprimento/10), 0.15))
+        for pos, valor in cargas_pontuais:
+            self._texto(pos, self.Y_CARGA + 0.45, f'{valor:.2f} kN', ha='center', color='red', fontsize=9, weight='bold')
+
+        y_topo_seta = self.Y_CARGA + self.ALTURA_CARGA
+        self.faixas_distribuidas.set_verts([[(inicio, self.Y_CARGA), (fim, self.Y_CARGA), (fim, y_topo_seta), (inicio, y_topo_seta)]
+                                            for inicio, fim, _ in cargas_distribuidas])
+        xs_setas = [np.linspace(inicio, fim, int((fim - inicio) * 4) + 2) for inicio, fim, _ in cargas_distribuidas]
+        xs_setas = np.concatenate(xs_setas) if xs_setas else np.empty(0)
+        self.setas_distribuidas.set_verts(self._setas(xs_setas, y_topo_seta, self.ALTURA_CARGA,
+                                                      0.08 * (comprimento/10), 0.1))
+        for inicio, fim, intensidade in cargas_distribuidas:
+            self._texto((inicio + fim) / 2, y_topo_seta + 0.15, f'{intensidade:.2f} kN/m',
+                        ha='center', color='blue', fontsize=9, weight='bold')
+
+        # Reta graduada
+        self.graduacao.set_segments([[(0, self.Y_GRADUACAO), (comprimento, self.Y_GRADUACAO)]])
+        marcacoes = np.linspace(0, comprimento, int(comprimento) + 1)
+        self.marcas.set_segments([[(x, self.Y_GRADUACAO - 0.05), (x, self.Y_GRADUACAO + 0.05)] for x in marcacoes])
+        for x_mark in marcacoes:
+            self._texto(x_mark, self.Y_GRADUACAO - 0.15, f'{x_mark:.1f}m', ha='center', va='top', fontsize=8)
+
+        self.ax_esquema.set_xlim(-0.5, comprimento + 0.5)
+        self.ax_esquema.set_ylim(self.Y_GRADUACAO - 0.4, y_viga + 1.2)
+        salvar_figura(self.fig_esquema, caminho, imagem, bbox_inches='tight')
+
+    def salvar_diagrama(self, caminho, diagrama, xs, ys, ys_min=None, imagem=None):
+        """Salva o diagrama de ys; com ys_min, a envoltória entre ys_min e ys."""
+        linha = diagrama["linha"]
+        fig, ax = linha.figure, linha.axes
+        linha.set_data(xs, ys)
+        if ys_min is None:
+            ax.set_title(diagrama["titulo"])
+            diagrama["linha_min"].set_data([], [])
+            diagrama["faixa"].set_verts([])
+        else:
+            ax.set_title(f"Envoltória - {diagrama['titulo']}")
+            diagrama["linha_min"].set_data(xs, ys_min)
+            diagrama["faixa"].set_verts([np.concatenate([np.column_stack([xs, ys]),
+                                                         np.column_stack([xs, ys_min])[::-1]])])
+        # Os limites da linha do zero são calculados com a vista atual; começa da vista
+        # (0, 1) de uma figura nova para não herdar erros de arredondamento da viga anterior
+        ax.set_xlim(0, 1, auto=None)
+        ax.set_ylim(0, 1, auto=None)
+        ax.relim()
+        ax.autoscale_view()
+        # O tight_layout parte da posição atual dos eixos; volta à posição de uma figura nova
+        # para que o resultado não dependa da viga anterior
+        fig.subplots_adjust(**self.margens_padrao)
+        fig.tight_layout()
+        salvar_figura(fig, caminho, imagem)
+
+_renderizador = None
+
+def renderizador_vigas():
+    """RenderizadorVigas do processo atual, criado no primeiro uso."""
+    global _renderizador
+    if _renderizador is None:
+        _renderizador = RenderizadorVigas()
+    return _renderizador
 
 def forca_cortante(x, reacoes, apoios, cargas_p, cargas_d):
     V = 0
@@ -133,34 +409,1631 @@ def momento_fletor(x, reacoes, apoios, cargas_p, cargas_d):
             M -= q * L * (x - xc)
     return M
 
+# Versões vetorizadas: avaliam V(x) e M(x) em toda a malha xs de uma só vez,
+# com o mesmo resultado numérico das funções escalares acima.
+def _arrays_cargas(apoios, reacoes, cargas_p, cargas_d):
+    apoios_arr = np.asarray(apoios, dtype=float)
+    reacoes_arr = np.asarray(reacoes, dtype=float)
+    pos_p = np.array([c["pos"] for c in cargas_p], dtype=float)
+    val_p = np.array([c["valor"] for c in cargas_p], dtype=float)
+    ini_d = np.array([c["inicio"] for c in cargas_d], dtype=float)
+    fim_d = np.array([c["fim"] for c in cargas_d], dtype=float)
+    q_d = np.array([c["intensidade"] for c in cargas_d], dtype=float)
+    return apoios_arr, reacoes_arr, pos_p, val_p, ini_d, fim_d, q_d
+
+def forca_cortante_vetorizada(xs, reacoes, apoios, cargas_p, cargas_d):
+    xs = np.asarray(xs, dtype=float)
+    apoios_arr, reacoes_arr, pos_p, val_p, ini_d, fim_d, q_d = _arrays_cargas(apoios, reacoes, cargas_p, cargas_d)
+    X = xs[:, None]
+    V = (X >= apoios_arr) @ reacoes_arr
+    V -= (X >= pos_p) @ val_p
+    # Trecho carregado à esquerda de x (0 antes do início, fim - inicio depois do fim)
+    V -= np.clip(X - ini_d, 0.0, fim_d - ini_d) @ q_d
+    return V
+
+def momento_fletor_vetorizado(xs, reacoes, apoios, cargas_p, cargas_d):
+    xs = np.asarray(xs, dtype=float)
+    apoios_arr, reacoes_arr, pos_p, val_p, ini_d, fim_d, q_d = _arrays_cargas(apoios, reacoes, cargas_p, cargas_d)
+    X = xs[:, None]
+    M = np.maximum(X - apoios_arr, 0.0) @ reacoes_arr
+    M -= np.maximum(X - pos_p, 0.0) @ val_p
+    # Resultante do trecho carregado aplicada no seu centroide (ini + trecho/2)
+    trecho = np.clip(X - ini_d, 0.0, fim_d - ini_d)
+    M -= (trecho * (X - ini_d - trecho / 2)) @ q_d
+    return M
+
+# Erro máximo do traçado de M entre amostras, como fração do |M| máximo da viga
+TOLERANCIA_DIAGRAMA = 0.002
+MAX_PONTOS_PARABOLA = 200
+
+class DiagramaEsforcos:
+    """Diagramas de V e M representados por trechos polinomiais exatos.
+
+    Entre dois pontos notáveis consecutivos (extremidades, apoios e limites de
+    carga) V é linear e M é quadrático. Os valores em cada ponto são os limites
+    à direita, como em forca_cortante e momento_fletor; o último trecho tem
+    comprimento zero e guarda os valores em x = L. pontos_extras acrescenta
+    pontos notáveis (os das cargas de outros casos), para que diagramas de
+    casos diferentes da mesma viga possam ser combinados trecho a trecho.
+    """
+    def __init__(self, L, apoios, reacoes, cargas_p, cargas_d, pontos_extras=()):
+        self.L = float(L)
+        pontos = [0.0, self.L] + list(apoios) + [c["pos"] for c in cargas_p] + list(pontos_extras)
+        pontos += [c["inicio"] for c in cargas_d] + [c["fim"] for c in cargas_d]
+        self.pontos = np.unique(np.asarray(pontos, dtype=float))
+        self.v0 = forca_cortante_vetorizada(self.pontos, reacoes, apoios, cargas_p, cargas_d)
+        self.m0 = momento_fletor_vetorizado(self.pontos, reacoes, apoios, cargas_p, cargas_d)
+        # dV/dx = -q, somando as cargas distribuídas ativas em cada trecho
+        _, _, _, _, ini_d, fim_d, q_d = _arrays_cargas(apoios, reacoes, cargas_p, cargas_d)
+        P = self.pontos[:, None]
+        self.inclinacao = -(((P >= ini_d) & (P < fim_d)) @ q_d)
+        self.comprimentos = np.append(np.diff(self.pontos), 0.0)
+
+    @classmethod
+    def combinar(cls, diagramas, fatores):
+        """Diagrama de Σ fator × diagrama, para diagramas com os mesmos pontos notáveis."""
+        combinado = cls.__new__(cls)
+        base = diagramas[0]
+        combinado.L, combinado.pontos, combinado.comprimentos = base.L, base.pontos, base.comprimentos
+        combinado.v0 = sum(f * d.v0 for d, f in zip(diagramas, fatores))
+        combinado.m0 = sum(f * d.m0 for d, f in zip(diagramas, fatores))
+        combinado.inclinacao = sum(f * d.inclinacao for d, f in zip(diagramas, fatores))
+        return combinado
+
+    def _trecho(self, xs):
+        xs = np.asarray(xs, dtype=float)
+        k = np.clip(np.searchsorted(self.pontos, xs, side="right") - 1, 0, len(self.pontos) - 1)
+        return xs, k, xs - self.pontos[k]
+
+    def cortante(self, xs):
+        _, k, dx = self._trecho(xs)
+        return self.v0[k] + self.inclinacao[k] * dx
+
+    def momento(self, xs):
+        _, k, dx = self._trecho(xs)
+        return self.m0[k] + self.v0[k] * dx + self.inclinacao[k] * dx**2 / 2
+
+    def cortante_maxima(self):
+        """Retorna (V, x) com o maior |V|, considerando os dois lados de cada salto."""
+        v_fim = self.v0 + self.inclinacao * self.comprimentos
+        valores = np.concatenate([self.v0, v_fim])
+        posicoes = np.concatenate([self.pontos, self.pontos + self.comprimentos])
+        i = int(np.argmax(np.abs(valores)))
+        return float(valores[i]), float(posicoes[i])
+
+    def momento_maximo(self):
+        """Retorna (M, x) com o maior |M|, incluindo os pontos de V = 0 dentro dos trechos."""
+        candidatos = list(self.pontos)
+        for x0, v, s, comp in zip(self.pontos, self.v0, self.inclinacao, self.comprimentos):
+            if s != 0 and 0 < -v / s < comp:
+                candidatos.append(x0 - v / s)
+        candidatos = np.asarray(candidatos)
+        valores = self.momento(candidatos)
+        i = int(np.argmax(np.abs(valores)))
+        return float(valores[i]), float(candidatos[i])
+
+    def _passos(self, tolerancia=None):
+        """Abscissas de amostragem de cada trecho, medidas a partir do início do trecho."""
+        if tolerancia is None:
+            tolerancia = TOLERANCIA_DIAGRAMA
+        erro_admissivel = tolerancia * abs(self.momento_maximo()[0])
+
+        passos = []
+        for comp, v, s in zip(self.comprimentos[:-1], self.v0, self.inclinacao):
+            if s == 0 or erro_admissivel == 0:
+                dx = np.array([0.0, comp])
+            else:
+                # Erro da corda numa parábola com M'' = s e passo h: |s| h² / 8
+                passo = math.sqrt(8 * erro_admissivel / abs(s))
+                n = min(MAX_PONTOS_PARABOLA, max(2, math.ceil(comp / passo) + 1))
+                dx = np.linspace(0.0, comp, n)
+                if 0 < -v / s < comp:
+                    dx = np.insert(dx, np.searchsorted(dx, -v / s), -v / s)
+            passos.append(dx)
+        return passos
+
+    def _avaliar_passos(self, passos):
+        xs, Vs, Ms = [], [], []
+        for k, dx in enumerate(passos):
+            x0, v, s = self.pontos[k], self.v0[k], self.inclinacao[k]
+            x = x0 + dx
+            x[-1] = self.pontos[k + 1]  # sem erro de arredondamento no ponto notável seguinte
+            xs.append(x)
+            Vs.append(v + s * dx)
+            Ms.append(self.m0[k] + v * dx + s * dx**2 / 2)
+        xs.append(self.pontos[-1:])
+        Vs.append(self.v0[-1:])
+        Ms.append(self.m0[-1:])
+        return np.concatenate(xs), np.concatenate(Vs), np.concatenate(Ms)
+
+    def amostras(self, tolerancia=None):
+        """Pontos para os gráficos: extremos de cada trecho e amostras só nas parábolas.
+
+        Os pontos notáveis aparecem duas vezes (fim de um trecho e início do
+        próximo), de modo que os saltos de V são desenhados na vertical. Sob
+        carga distribuída, o passo é o maior com que a poligonal se afasta da
+        parábola de M no máximo tolerancia × |M| máximo (padrão
+        TOLERANCIA_DIAGRAMA), e o vértice da parábola, quando cai dentro do
+        trecho, também é amostrado.
+        """
+        return self._avaliar_passos(self._passos(tolerancia))
+
+def envoltoria_esforcos(diagramas, tolerancia=None):
+    """Retorna xs, V mín, V máx, M mín e M máx entre diagramas com os mesmos pontos notáveis.
+
+    Todos os diagramas são avaliados nas mesmas abscissas: em cada trecho, a
+    união das amostras que cada um usaria sozinho.
+    """
+    passos = [np.unique(np.concatenate(dxs)) for dxs in zip(*(d._passos(tolerancia) for d in diagramas))]
+    amostras = [d._avaliar_passos(passos) for d in diagramas]
+    Vs = np.array([V for _, V, _ in amostras])
+    Ms = np.array([M for _, _, M in amostras])
+    return amostras[0][0], Vs.min(axis=0), Vs.max(axis=0), Ms.min(axis=0), Ms.max(axis=0)
+
+# ============================ CACHE ============================
+# Versão do desenho das figuras: deve ser incrementada sempre que RenderizadorVigas,
+# gerar_graficos_viga ou a amostragem dos diagramas mudarem, para invalidar as
+# entradas antigas do cache.
+VERSAO_RENDERIZACAO = 3
+FIGURAS_CACHE = ("esquema.png", "cortante.png", "momento.png")
+
+def pasta_cache_padrao():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "CalculadoraVigas", "cache")
+
+class CacheVigas:
+    """Cache em disco dos resultados e figuras de cada viga, endereçado por conteúdo.
+
+    Cada entrada é uma pasta nomeada pelo hash da definição da viga com um
+    dados.json e as três figuras. A data de modificação do dados.json marca o
+    último uso e orienta a remoção das entradas menos usadas em limpar().
+    """
+    def __init__(self, pasta, limite_mb=500):
+        self.pasta = pasta
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        os.makedirs(self.pasta, exist_ok=True)
+
+    @staticmethod
+    def chave(tipo, L, apoios, cargas_p, cargas_d, vetorial=False, combinacoes=None, imagem=None, tolerancia=None):
+        definicao = [VERSAO_RENDERIZACAO, tipo, L, apoios, cargas_p, cargas_d]
+        if tolerancia is not None and tolerancia != TOLERANCIA_DIAGRAMA:
+            definicao.append({"tolerancia": float(tolerancia)})  # Outras amostras dos diagramas
+        if vetorial:
+            definicao.append("vetorial")  # Entradas só com dados, sem PNGs
+        elif imagem:
+            definicao.append({"imagem": imagem})
+        if combinacoes:
+            definicao.append({"combinacoes": combinacoes})
+        texto = json.dumps(definicao, sort_keys=True, ensure_ascii=False, default=float)
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    def _pasta_entrada(self, chave):
+        return os.path.join(self.pasta, chave[:2], chave)
+
+    def obter(self, chave):
+        """Retorna (dados, figuras) da entrada ou None se ela não existir."""
+        pasta = self._pasta_entrada(chave)
+        arquivo_dados = os.path.join(pasta, "dados.json")
+        try:
+            with open(arquivo_dados, encoding="utf-8") as f:
+                dados = json.load(f)
+            figuras = tuple(os.path.join(pasta, nome) for nome in dados.pop("arquivos", FIGURAS_CACHE))
+            if not all(os.path.exists(fig) for fig in figuras):
+                return None
+            os.utime(arquivo_dados)
+        except (OSError, ValueError):
+            return None
+        return dados, figuras
+
+    def gravar(self, chave, dados, figuras):
+        pasta = self._pasta_entrada(chave)
+        if os.path.exists(pasta):
+            return
+        os.makedirs(os.path.dirname(pasta), exist_ok=True)
+        # A entrada é montada numa pasta temporária e renomeada no final, para que
+        # processos concorrentes nunca vejam uma entrada incompleta.
+        temporaria = tempfile.mkdtemp(dir=os.path.dirname(pasta), prefix=".tmp-")
+        try:
+            # O FPDF reconhece o formato pela extensão, que vem da figura original
+            arquivos = [os.path.splitext(nome)[0] + os.path.splitext(origem)[1]
+                        for origem, nome in zip(figuras, FIGURAS_CACHE)]
+            for origem, nome in zip(figuras, arquivos):
+                shutil.copyfile(origem, os.path.join(temporaria, nome))
+            with open(os.path.join(temporaria, "dados.json"), "w", encoding="utf-8") as f:
+                json.dump({**dados, "arquivos": arquivos}, f, default=float)
+            os.rename(temporaria, pasta)
+        except OSError:
+            shutil.rmtree(temporaria, ignore_errors=True)
+
+    def limpar(self):
+        """Remove as entradas menos usadas até o cache caber no limite de tamanho."""
+        entradas = []
+        total = 0
+        try:
+            prefixos = [p.path for p in os.scandir(self.pasta) if p.is_dir()]
+        except OSError:
+            return
+        for prefixo in prefixos:
+            for entrada in os.scandir(prefixo):
+                if entrada.name.startswith(".tmp-"):
+                    continue
+                try:
+                    tamanho = sum(arq.stat().st_size for arq in os.scandir(entrada.path))
+                    uso = os.stat(os.path.join(entrada.path, "dados.json")).st_mtime
+                except OSError:
+                    uso, tamanho = 0, 0
+                entradas.append((uso, tamanho, entrada.path))
+                total += tamanho
+        for uso, tamanho, caminho in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            shutil.rmtree(caminho, ignore_errors=True)
+            total -= tamanho
+
+def abrir_cache(pasta=None, limite_mb=500):
+    """Abre o cache na pasta indicada (ou na padrão); sem permissão de escrita, segue sem cache."""
+    try:
+        return CacheVigas(pasta or pasta_cache_padrao(), limite_mb)
+    except OSError:
+        return None
+
+# ============================ RELATÓRIO PDF ============================
+class PDFIncremental(FPDF):
+    """FPDF que grava cada página no disco assim que ela é concluída.
+
+    O FPDF guarda todas as páginas e imagens na memória até output(). Aqui o
+    conteúdo da página e as imagens usadas pela primeira vez nela são escritos
+    ao fechar a página; no fim só restam fontes, recursos, catálogo e a tabela
+    xref. O arquivo é montado em caminho + ".parcial" e renomeado em output().
+    Links internos entre páginas não são suportados. Imagens com o mesmo
+    conteúdo, ainda que em arquivos diferentes, são embutidas uma única vez.
+    """
+    def __init__(self, caminho, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.caminho = caminho
+        self._caminho_parcial = caminho + ".parcial"
+        self._objetos_paginas = []
+        self._imagens_pendentes = []
+        self._imagens_por_conteudo = {}
+        # Os PNGs do matplotlib têm canal alfa, o que já exige PDF 1.4
+        self.pdf_version = "1.4"
+        self._arquivo = open(self._caminho_parcial, "wb")
+        self._posicao = 0
+        self._out(f"%PDF-{self.pdf_version}")
+
+    def _out(self, s):
+        if self.state == 2:
+            return super()._out(s)
+        dados = s if isinstance(s, bytes) else str(s).encode("latin1")
+        self._arquivo.write(dados + b"\n")
+        self._posicao += len(dados) + 1
+
+    def _newobj(self):
+        self.n += 1
+        self.offsets[self.n] = self._posicao
+        self._out(f"{self.n} 0 obj")
+
+    def image(self, name, *args, **kwargs):
+        if name not in self.images:
+            with open(name, "rb") as f:
+                conteudo = hashlib.sha1(f.read()).digest()
+            name = self._imagens_por_conteudo.setdefault(conteudo, name)
+        nova = name not in self.images
+        resultado = super().image(name, *args, **kwargs)
+        if nova:
+            self._imagens_pendentes.append(self.images[name])
+        return resultado
+
+    def _endpage(self):
+        super()._endpage()
+        w_pt, h_pt = (self.fw_pt, self.fh_pt) if self.def_orientation == "P" else (self.fh_pt, self.fw_pt)
+
+        # Página primeiro, para que a primeira página seja o objeto 3 esperado por _putcatalog
+        self._newobj()
+        self._objetos_paginas.append(self.n)
+        self._out("<</Type /Page")
+        self._out("/Parent 1 0 R")
+        if self.page in self.orientation_changes:
+            self._out(sprintf("/MediaBox [0 0 %.2f %.2f]", h_pt, w_pt))
+        self._out("/Resources 2 0 R")
+        self._out("/Group <</Type /Group /S /Transparency /CS /DeviceRGB>>")
+        self._out(f"/Contents {self.n + 1} 0 R>>")
+        self._out("endobj")
+
+        conteudo = self.pages[self.page].encode("latin1")
+        filtro = ""
+        if self.compress:
+            conteudo = zlib.compress(conteudo)
+            filtro = "/Filter /FlateDecode "
+        self._newobj()
+        self._out(f"<<{filtro}/Length {len(conteudo)}>>")
+        self._putstream(conteudo)
+        self._out("endobj")
+        self.pages[self.page] = ""
+
+        self._putimages()
+
+    def _parsepng(self, name):
+        # O FPDF separa o canal alfa com expressões regulares linha a linha, o que
+        # custa quase um segundo por figura do matplotlib; aqui o numpy faz isso
+        with Image.open(name) as figura:
+            if figura.mode not in ("RGBA", "LA"):
+                return super()._parsepng(name)
+            pixels = np.asarray(figura)
+        h, w, canais = pixels.shape
+        # Cada linha começa com o filtro 0 (nenhum), como pede o /Predictor 15
+        filtro = np.zeros((h, 1), dtype=np.uint8)
+        cor = np.hstack([filtro, pixels[:, :, :-1].reshape(h, -1)])
+        info = {"w": w, "h": h, "cs": "DeviceRGB" if canais == 4 else "DeviceGray", "bpc": 8, "f": "FlateDecode",
+                "dp": f"/Predictor 15 /Colors {canais - 1} /BitsPerComponent 8 /Columns {w}", "pal": "", "trns": "",
+                "data": zlib.compress(cor.tobytes())}
+        # Figuras totalmente opacas dispensam a máscara de transparência
+        if not (pixels[:, :, -1] == 255).all():
+            info["smask"] = zlib.compress(np.hstack([filtro, pixels[:, :, -1]]).tobytes())
+        return info
+
+    def _putimages(self):
+        for info in self._imagens_pendentes:
+            self._putimage(info)
+            del info["data"]
+            info.pop("smask", None)
+        self._imagens_pendentes = []
+
+    def _putpages(self):
+        w_pt, h_pt = (self.fw_pt, self.fh_pt) if self.def_orientation == "P" else (self.fh_pt, self.fw_pt)
+        self.offsets[1] = self._posicao
+        self._out("1 0 obj")
+        self._out("<</Type /Pages")
+        self._out("/Kids [" + " ".join(f"{n} 0 R" for n in self._objetos_paginas) + "]")
+        self._out(f"/Count {len(self._objetos_paginas)}")
+        self._out(sprintf("/MediaBox [0 0 %.2f %.2f]", w_pt, h_pt))
+        self._out(">>")
+        self._out("endobj")
+
+    def _putresources(self):
+        self._putfonts()
+        self._putimages()
+        self.offsets[2] = self._posicao
+        self._out("2 0 obj")
+        self._out("<<")
+        self._putresourcedict()
+        self._out(">>")
+        self._out("endobj")
+
+    def _enddoc(self):
+        self._putpages()
+        self._putresources()
+        self._newobj()
+        self._out("<<")
+        self._putinfo()
+        self._out(">>")
+        self._out("endobj")
+        self._newobj()
+        self._out("<<")
+        self._putcatalog()
+        self._out(">>")
+        self._out("endobj")
+        inicio_xref = self._posicao
+        self._out("xref")
+        self._out(f"0 {self.n + 1}")
+        self._out("0000000000 65535 f ")
+        for i in range(1, self.n + 1):
+            self._out(sprintf("%010d 00000 n ", self.offsets[i]))
+        self._out("trailer")
+        self._out("<<")
+        self._puttrailer()
+        self._out(">>")
+        self._out("startxref")
+        self._out(inicio_xref)
+        self._out("%%EOF")
+        self.state = 3
+
+    def output(self):
+        if self.state < 3:
+            self.close()
+        self._arquivo.close()
+        os.replace(self._caminho_parcial, self.caminho)
+
+    def poligono(self, pontos, estilo=""):
+        """Polígono fechado com vértices em mm; estilo como em rect ('', 'F' ou 'DF')."""
+        operador = {"F": "f", "FD": "b", "DF": "b"}.get(estilo, "s")
+        self._caminho(pontos, operador)
+
+    def polilinha(self, pontos):
+        """Linha aberta passando pelos pontos (em mm), num único caminho do PDF."""
+        self._caminho(pontos, "S")
+
+    def _caminho(self, pontos, operador):
+        coordenadas = [sprintf("%.2f %.2f", x * self.k, (self.h - y) * self.k) for x, y in pontos]
+        self._out(coordenadas[0] + " m " + "".join(c + " l " for c in coordenadas[1:]) + operador)
+
+    def descartar(self):
+        """Fecha e apaga o arquivo parcial, sem gerar o relatório."""
+        self._arquivo.close()
+        if os.path.exists(self._caminho_parcial):
+            os.remove(self._caminho_parcial)
+
+class PDFMemoria(FPDF):
+    """Mesma interface de PDFIncremental só com a API pública do FPDF.
+
+    Usada com o fpdf2, que instala o mesmo módulo fpdf mas não tem os métodos
+    internos do 1.7.2: o documento fica na memória até output(), como no FPDF.
+    """
+    def __init__(self, caminho, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.caminho = caminho
+
+    def output(self):
+        parcial = self.caminho + ".parcial"
+        super().output(parcial)
+        os.replace(parcial, self.caminho)
+
+    def poligono(self, pontos, estilo=""):
+        self.polygon(pontos, style=estilo or "D")
+
+    def polilinha(self, pontos):
+        self.polyline(pontos)
+
+    def descartar(self):
+        pass
+
+if sprintf is None:
+    PDFIncremental = PDFMemoria
+
+# ============================ FIGURAS VETORIAIS ============================
+# Desenho do esquema da viga e dos diagramas direto no PDF, com as primitivas do
+# FPDF, sem passar pelo matplotlib. Reproduz o leiaute do esquema e dos
+# gráficos de RenderizadorVigas. Todas as medidas estão em mm.
+LARGURA_FIGURA = 180
+ALTURA_ESQUEMA = 62
+ALTURA_DIAGRAMA = 68
+COR_CORTANTE = (31, 119, 180)
+COR_MOMENTO = (255, 165, 0)
+
+def _marcas_eixo(vmin, vmax, quantidade=6):
+    """Marcas 'redondas' (1, 2, 2.5 ou 5 x 10^n) entre vmin e vmax, e o passo usado."""
+    passo_bruto = (vmax - vmin) / quantidade
+    grandeza = 10 ** math.floor(math.log10(passo_bruto))
+    passo = next(m * grandeza for m in (1, 2, 2.5, 5, 10) if passo_bruto <= m * grandeza)
+    primeira = math.ceil(vmin / passo - 1e-9)
+    marcas = []
+    while (primeira + len(marcas)) * passo <= vmax + passo * 1e-9:
+        marcas.append((primeira + len(marcas)) * passo)
+    return marcas, passo
+
+def _formatar_marca(valor, passo):
+    # Casas decimais suficientes para representar o passo (ex.: 2.5 -> 1, 0.25 -> 2)
+    casas = 0
+    while casas < 6 and abs(passo * 10**casas - round(passo * 10**casas)) > 1e-9:
+        casas += 1
+    texto = f"{valor:.{casas}f}"
+    return "0" if float(texto) == 0 else texto
+
+def _texto_centralizado(pdf, x, y, texto):
+    pdf.text(x - pdf.get_string_width(texto) / 2, y, texto)
+
+def _seta_vertical(pdf, x, y_topo, y_ponta, largura_ponta, altura_ponta):
+    pdf.line(x, y_topo, x, y_ponta - altura_ponta)
+    pdf.poligono([(x - largura_ponta / 2, y_ponta - altura_ponta), (x + largura_ponta / 2, y_ponta - altura_ponta),
+                  (x, y_ponta)], "F")
+
+def desenhar_viga_vetorial(pdf, comprimento, cargas_p, cargas_d, pos_apoios):
+    x0, y0 = pdf.l_margin + (pdf.w - pdf.l_margin - pdf.r_margin - LARGURA_FIGURA) / 2, pdf.get_y()
+    escala_x = LARGURA_FIGURA / (comprimento + 1.0)
+    px = lambda x: x0 + (x + 0.5) * escala_x
+
+    pdf.set_font("Arial", "", 12)
+    pdf.set_text_color(0, 0, 0)
+    _texto_centralizado(pdf, x0 + LARGURA_FIGURA / 2, y0 + 6, "Diagrama da Viga e Carregamentos")
+
+    # Alturas de referência (de cima para baixo)
+    y_rotulo_dist = y0 + 16
+    y_topo_carga = y0 + 20
+    y_base_carga = y0 + 28
+    y_viga = y0 + 31
+    altura_viga = 4
+    y_graduacao = y0 + 50
+
+    # Cargas distribuídas: faixa clara, setas e intensidade
+    pdf.set_line_width(0.2)
+    for c in cargas_d:
+        inicio, fim, intensidade = c["inicio"], c["fim"], c["intensidade"]
+        pdf.set_fill_color(204, 204, 255)
+        pdf.rect(px(inicio), y_topo_carga, (fim - inicio) * escala_x, y_base_carga - y_topo_carga, "F")
+        pdf.set_draw_color(0, 0, 255)
+        pdf.set_fill_color(0, 0, 255)
+        for x in np.linspace(inicio, fim, int((fim - inicio) * 4) + 2):
+            _seta_vertical(pdf, px(x), y_topo_carga, y_base_carga, 1.2, 1.5)
+        pdf.set_font("Arial", "B", 8)
+        pdf.set_text_color(0, 0, 255)
+        _texto_centralizado(pdf, px((inicio + fim) / 2), y_rotulo_dist, f"{intensidade:.2f} kN/m")
+
+    # Cargas pontuais: seta vermelha até a face superior da viga
+    pdf.set_line_width(0.6)
+    pdf.set_draw_color(255, 0, 0)
+    pdf.set_fill_color(255, 0, 0)
+    pdf.set_font("Arial", "B", 8)
+    pdf.set_text_color(255, 0, 0)
+    for c in cargas_p:
+        _seta_vertical(pdf, px(c["pos"]), y_topo_carga, y_viga - altura_viga / 2, 2.2, 2.5)
+        _texto_centralizado(pdf, px(c["pos"]), y_topo_carga - 2, f"{c['valor']:.2f} kN")
+
+    # Viga
+    pdf.set_line_width(0.4)
+    pdf.set_draw_color(0, 0, 0)
+    pdf.set_fill_color(211, 211, 211)
+    pdf.rect(px(0), y_viga - altura_viga / 2, comprimento * escala_x, altura_viga, "DF")
+
+    # Apoios: triângulos abaixo da viga
+    pdf.set_fill_color(0, 0, 0)
+    pdf.set_font("Arial", "", 8)
+    pdf.set_text_color(0, 0, 0)
+    y_apoio = y_viga + altura_viga / 2
+    for i, x in enumerate(pos_apoios):
+        pdf.poligono([(px(x), y_apoio), (px(x) - 2.5, y_apoio + 4), (px(x) + 2.5, y_apoio + 4)], "F")
+        _texto_centralizado(pdf, px(x), y_apoio + 8, f"Apoio {i+1}")
+
+    # Reta graduada, com uma marca por metro
+    pdf.set_line_width(0.2)
+    pdf.line(px(0), y_graduacao, px(comprimento), y_graduacao)
+    pdf.set_font("Arial", "", 6)
+    for x_mark in np.linspace(0, comprimento, int(comprimento) + 1):
+        pdf.line(px(x_mark), y_graduacao - 1, px(x_mark), y_graduacao + 1)
+        _texto_centralizado(pdf, px(x_mark), y_graduacao + 4, f"{x_mark:.1f}m")
+
+    pdf.set_y(y0 + ALTURA_ESQUEMA)
+
+def desenhar_diagrama_vetorial(pdf, xs, ys, titulo, rotulo_y, cor, ys_min=None):
+    x0, y0 = pdf.l_margin + (pdf.w - pdf.l_margin - pdf.r_margin - LARGURA_FIGURA) / 2, pdf.get_y()
+    # Área do gráfico dentro da figura (margens para título, marcas e rótulos)
+    esquerda, direita = x0 + 20, x0 + LARGURA_FIGURA - 4
+    topo, base = y0 + 9, y0 + ALTURA_DIAGRAMA - 14
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    faixa = ys if ys_min is None else np.concatenate([ys, ys_min])
+    x_min, x_max = float(xs.min()), float(xs.max())
+    y_min, y_max = min(float(faixa.min()), 0.0), max(float(faixa.max()), 0.0)
+    if y_max - y_min < 1e-9:
+        y_min, y_max = y_min - 1, y_max + 1
+    # Folga de 5% como nos gráficos do matplotlib
+    folga_x, folga_y = 0.05 * (x_max - x_min or 1), 0.05 * (y_max - y_min)
+    x_min, x_max, y_min, y_max = x_min - folga_x, x_max + folga_x, y_min - folga_y, y_max + folga_y
+    px = lambda x: esquerda + (x - x_min) / (x_max - x_min) * (direita - esquerda)
+    py = lambda y: base - (y - y_min) / (y_max - y_min) * (base - topo)
+
+    pdf.set_text_color(0, 0, 0)
+    pdf.set_draw_color(0, 0, 0)
+    pdf.set_font("Arial", "", 11)
+    _texto_centralizado(pdf, (esquerda + direita) / 2, y0 + 6, titulo)
+
+    # Marcas e rótulos dos eixos
+    pdf.set_font("Arial", "", 8)
+    pdf.set_line_width(0.2)
+    marcas, passo = _marcas_eixo(x_min, x_max)
+    for x in marcas:
+        pdf.line(px(x), base, px(x), base + 1.2)
+        _texto_centralizado(pdf, px(x), base + 4.5, _formatar_marca(x, passo))
+    marcas, passo = _marcas_eixo(y_min, y_max)
+    for y in marcas:
+        texto = _formatar_marca(y, passo)
+        pdf.line(esquerda - 1.2, py(y), esquerda, py(y))
+        pdf.text(esquerda - 2 - pdf.get_string_width(texto), py(y) + 1, texto)
+    pdf.set_font("Arial", "", 9)
+    _texto_centralizado(pdf, (esquerda + direita) / 2, base + 9.5, "Posição (m)")
+    pdf.rotate(90, x0 + 5, (topo + base) / 2)
+    _texto_centralizado(pdf, x0 + 5, (topo + base) / 2, rotulo_y)
+    pdf.rotate(0)
+
+    # Moldura, linha do zero e curva
+    pdf.rect(esquerda, topo, direita - esquerda, base - topo)
+    pdf.set_line_width(0.25)
+    pdf.line(esquerda, py(0), direita, py(0))
+    pontos = [(px(x), py(y)) for x, y in zip(xs, ys)]
+    if ys_min is not None:
+        # Envoltória: faixa clara entre as curvas de mínimo e de máximo
+        pontos_min = [(px(x), py(y)) for x, y in zip(xs, ys_min)]
+        pdf.set_fill_color(*(round(255 - 0.2 * (255 - c)) for c in cor))
+        pdf.poligono(pontos + pontos_min[::-1], "F")
+    pdf.set_line_width(0.4)
+    pdf.set_draw_color(*cor)
+    pdf.polilinha(pontos)
+    if ys_min is not None:
+        pdf.polilinha(pontos_min)
+    pdf.set_draw_color(0, 0, 0)
+    pdf.set_line_width(0.2)
+
+    pdf.set_y(y0 + ALTURA_DIAGRAMA)
+
+# ============================ PERFIL DE DESEMPENHO ============================
+# Ativado com --perfil na linha de comando ou com a variável de ambiente
+# CALCULADORA_VIGAS_PERFIL=1 (vale também para a interface gráfica). O resumo
+# vai para um JSON ao lado do PDF: <relatorio>_perfil.json.
+VARIAVEL_PERFIL = "CALCULADORA_VIGAS_PERFIL"
+VIGAS_MAIS_LENTAS = 10
+
+def perfil_ativado():
+    return os.environ.get(VARIAVEL_PERFIL, "").strip().lower() not in ("", "0", "false", "nao", "não")
+
+def caminho_perfil(pdf_path):
+    return os.path.splitext(pdf_path)[0] + "_perfil.json"
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    class _ContadoresMemoria(ctypes.Structure):
+        # PROCESS_MEMORY_COUNTERS da psapi
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    _kernel32 = ctypes.WinDLL("kernel32")
+    _psapi = ctypes.WinDLL("psapi")
+    _kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    _psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(_ContadoresMemoria), wintypes.DWORD]
+    _psapi.GetProcessMemoryInfo.restype = wintypes.BOOL
+
+    def _contadores_memoria():
+        contadores = _ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        if not _psapi.GetProcessMemoryInfo(_kernel32.GetCurrentProcess(), ctypes.byref(contadores), contadores.cb):
+            return None
+        return contadores
+
+_TAMANHO_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else None
+
+def _memoria_atual():
+    # Memória residente atual do processo em bytes: /proc/self/statm no Linux, psapi no Windows; None nos outros
+    if sys.platform == "win32":
+        contadores = _contadores_memoria()
+        return None if contadores is None else contadores.WorkingSetSize
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _TAMANHO_PAGINA
+    except (OSError, ValueError, IndexError, TypeError):
+        return None
+
+def _memoria_pico():
+    # Pico de memória residente do processo em bytes, desde o início; None onde não há como medir
+    if sys.platform == "win32":
+        contadores = _contadores_memoria()
+        return None if contadores is None else contadores.PeakWorkingSetSize
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024
+
+def _somar(a, b):
+    return a if b is None else b if a is None else a + b
+
+def _maior(a, b):
+    return a if b is None else b if a is None else max(a, b)
+
+@contextmanager
+def _medir(tempos, nome):
+    # tempos[nome] = [segundos, chamadas, variação da memória residente, maior memória residente], em bytes
+    atual_inicial, pico_inicial = _memoria_atual(), _memoria_pico()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        atual_final, pico_final = _memoria_atual(), _memoria_pico()
+        registro = tempos.setdefault(nome, [0.0, 0, None, None])
+        registro[0] += segundos
+        registro[1] += 1
+        if atual_inicial is not None and atual_final is not None:
+            registro[2] = _somar(registro[2], atual_final - atual_inicial)
+        # Se o pico do processo subiu durante a etapa, foi nela que ele aconteceu; senão, fica a maior amostra
+        if pico_final is not None and pico_final > pico_inicial:
+            registro[3] = _maior(registro[3], pico_final)
+        else:
+            registro[3] = _maior(registro[3], _maior(atual_inicial, atual_final))
+
+def _megabytes(n):
+    return None if n is None else round(n / 2**20, 3)
+
+def _resumir_tempos(tempos):
+    return {nome: {"tempo_s": round(t, 6), "chamadas": n, "variacao_memoria_mb": _megabytes(variacao),
+                   "pico_memoria_mb": _megabytes(pico)}
+            for nome, (t, n, variacao, pico) in tempos.items()}
+
+class PerfilExecucao:
+    """Tempo e memória de cada etapa e de cada viga de uma geração de relatório.
+
+    As etapas de cada viga (cálculo, diagramas, figuras, cache) são medidas em
+    processar_viga, inclusive nos processos auxiliares, e somadas aqui; com
+    processos paralelos essas somas podem passar do tempo total. Para a memória
+    ficam a variação da memória residente em cada etapa e a maior memória
+    residente do processo (o principal ou o auxiliar) durante ela.
+    """
+    def __init__(self):
+        self.etapas = {}
+        self.vigas = []
+        self.inicio = time.perf_counter()
+
+    def etapa(self, nome):
+        return _medir(self.etapas, nome)
+
+    def registrar_viga(self, indice, resultado):
+        tempos = resultado.get("perfil", {})
+        for nome, (t, n, variacao, pico) in tempos.items():
+            registro = self.etapas.setdefault(nome, [0.0, 0, None, None])
+            registro[0] += t
+            registro[1] += n
+            registro[2] = _somar(registro[2], variacao)
+            registro[3] = _maior(registro[3], pico)
+        self.vigas.append({"indice": indice, "id": resultado["id"],
+                           "tempo_s": sum(registro[0] for registro in tempos.values()), "etapas": tempos})
+
+    def resumo(self):
+        mais_lentas = sorted(self.vigas, key=lambda v: v["tempo_s"], reverse=True)[:VIGAS_MAIS_LENTAS]
+        return {
+            "total_s": round(time.perf_counter() - self.inicio, 6),
+            "vigas": len(self.vigas),
+            "pico_memoria_mb": _megabytes(_memoria_pico()),
+            "memoria_atual_mb": _megabytes(_memoria_atual()),
+            "etapas": _resumir_tempos(self.etapas),
+            "vigas_mais_lentas": [{"indice": v["indice"], "id": v["id"], "tempo_s": round(v["tempo_s"], 6),
+                                   "etapas": _resumir_tempos(v["etapas"])} for v in mais_lentas],
+        }
+
+    def gravar(self, caminho):
+        resumo = self.resumo()
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(resumo, f, ensure_ascii=False, indent=2, default=str)
+        return resumo
+
+def _medir_iteracao(iteravel, medir, nome):
+    # Mede só o tempo gasto para obter cada item, não o processamento dele
+    iterador = iter(iteravel)
+    while True:
+        with medir(nome):
+            item = next(iterador, None)
+        if item is None:
+            return
+        yield item
+
 # ============================ PROCESSAMENTO ============================
-def processar_arquivo(caminho):
+COLUNAS_OBRIGATORIAS = ["ID", "Tipo", "L (m)", "Apoios (m)", "Cargas JSON"]
+# Coluna opcional: {"combinação": {"caso": fator}}; com ela, cada carga indica o seu "caso"
+COLUNA_COMBINACOES = "Combinações JSON"
+TIPOS_VIGA = ["biapoiada", "balanço", "contínua"]
+
+class ErroPlanilha(Exception):
+    """Erro que impede a leitura da planilha inteira (arquivo, aba ou colunas)."""
+    def __init__(self, titulo, mensagem):
+        super().__init__(mensagem)
+        self.titulo = titulo
+        self.mensagem = mensagem
+
+def ler_planilha(caminho):
     try:
         # 1. Validação do arquivo e da aba
         xls = pd.ExcelFile(caminho)
         if "Vigas" not in xls.sheet_names:
-            messagebox.showerror("Erro de Planilha", "A planilha deve conter uma aba chamada 'Vigas'.")
-            return
+            raise ErroPlanilha("Erro de Planilha", "A planilha deve conter uma aba chamada 'Vigas'.")
 
         df = pd.read_excel(xls, sheet_name="Vigas")
 
+    except ErroPlanilha:
+        raise
     except FileNotFoundError:
-        messagebox.showerror("Erro de Arquivo", "Arquivo não encontrado. Verifique o caminho.")
-        return
+        raise ErroPlanilha("Erro de Arquivo", "Arquivo não encontrado. Verifique o caminho.")
     except pd.errors.EmptyDataError:
-        messagebox.showerror("Erro de Conteúdo", "O arquivo Excel está vazio ou a aba 'Vigas' não contém dados.")
-        return
+        raise ErroPlanilha("Erro de Conteúdo", "O arquivo Excel está vazio ou a aba 'Vigas' não contém dados.")
     except Exception as e:
-        messagebox.showerror("Erro ao Ler Planilha", f"Erro inesperado ao ler o arquivo Excel:\n{e}")
-        return
+        raise ErroPlanilha("Erro ao Ler Planilha", f"Erro inesperado ao ler o arquivo Excel:\n{e}")
 
     # 2. Validação das colunas obrigatórias
-    colunas_obrigatorias = ["ID", "Tipo", "L (m)", "Apoios (m)", "Cargas JSON"]
-    if not all(col in df.columns for col in colunas_obrigatorias):
-        missing_cols = [col for col in colunas_obrigatorias if col not in df.columns]
-        messagebox.showerror("Erro de Formato",
-                            f"A planilha 'Vigas' deve conter as seguintes colunas: {', '.join(colunas_obrigatorias)}.\n"
-                            f"Colunas faltando: {', '.join(missing_cols)}")
+    _verificar_colunas(df.columns)
+    return df
+
+def _verificar_colunas(colunas):
+    missing_cols = [col for col in COLUNAS_OBRIGATORIAS if col not in colunas]
+    if missing_cols:
+        raise ErroPlanilha("Erro de Formato",
+                           f"A planilha 'Vigas' deve conter as seguintes colunas: {', '.join(COLUNAS_OBRIGATORIAS)}.\n"
+                           f"Colunas faltando: {', '.join(missing_cols)}")
+
+def ler_vigas_em_blocos(caminho, tamanho_bloco=200):
+    """Lê as vigas aos poucos, em DataFrames de até tamanho_bloco linhas.
+
+    Aceita .xlsx (openpyxl em modo somente leitura, aba 'Vigas'), .csv e
+    .jsonl com as mesmas colunas; outros formatos do Excel são lidos inteiros
+    por ler_planilha. O arquivo e as colunas são conferidos já nesta chamada,
+    que lança ErroPlanilha; a leitura das linhas fica para o gerador devolvido.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in (".xlsx", ".xlsm", ".csv", ".jsonl", ".ndjson"):
+        return iter([ler_planilha(caminho)])
+
+    try:
+        if extensao in (".xlsx", ".xlsm"):
+            livro = openpyxl.load_workbook(caminho, read_only=True, data_only=True)
+            if "Vigas" not in livro.sheetnames:
+                livro.close()
+                raise ErroPlanilha("Erro de Planilha", "A planilha deve conter uma aba chamada 'Vigas'.")
+            linhas = livro["Vigas"].iter_rows(values_only=True)
+            cabecalho = next(linhas, None)
+            if cabecalho is None:
+                livro.close()
+                raise pd.errors.EmptyDataError()
+            _verificar_colunas(cabecalho)
+            return _blocos_openpyxl(livro, linhas, list(cabecalho), tamanho_bloco)
+
+        if extensao == ".csv":
+            leitor = pd.read_csv(caminho, chunksize=tamanho_bloco)
+        else:
+            leitor = pd.read_json(caminho, lines=True, chunksize=tamanho_bloco, dtype=False)
+        primeiro = next(iter(leitor), None)
+        if primeiro is None:
+            raise pd.errors.EmptyDataError()
+        _verificar_colunas(primeiro.columns)
+        return itertools.chain([primeiro], leitor)
+
+    except ErroPlanilha:
+        raise
+    except FileNotFoundError:
+        raise ErroPlanilha("Erro de Arquivo", "Arquivo não encontrado. Verifique o caminho.")
+    except pd.errors.EmptyDataError:
+        raise ErroPlanilha("Erro de Conteúdo", "O arquivo está vazio ou a aba 'Vigas' não contém dados.")
+    except Exception as e:
+        raise ErroPlanilha("Erro ao Ler Planilha", f"Erro inesperado ao ler o arquivo:\n{e}")
+
+def _blocos_openpyxl(livro, linhas, cabecalho, tamanho_bloco):
+    try:
+        bloco = []
+        for linha in linhas:
+            if all(v is None for v in linha):
+                continue  # Linhas vazias (comuns no fim da aba) são ignoradas
+            bloco.append([np.nan if v is None else v for v in linha])
+            if len(bloco) == tamanho_bloco:
+                yield pd.DataFrame(bloco, columns=cabecalho)
+                bloco = []
+        if bloco:
+            yield pd.DataFrame(bloco, columns=cabecalho)
+    finally:
+        livro.close()
+
+CARGA_PONTUAL, CARGA_DISTRIBUIDA = 0, 1
+
+class TabelaVigas:
+    """Vigas de uma planilha já validadas, guardadas em arrays contíguos.
+
+    Apoios e cargas de todas as vigas ficam em arrays únicos; a viga i ocupa
+    as posições inicio_apoios[i]:inicio_apoios[i+1] (e o mesmo para as cargas).
+    Para cargas pontuais, carga_a é a posição; para distribuídas, carga_a e
+    carga_b são início e fim. carga_caso traz o caso de cada carga (ou None) e
+    combinacoes, as combinações de cada viga (ou None). erros mapeia o índice
+    da viga em (mensagem, inesperado); os apoios e as cargas das vigas com erro
+    podem estar incompletos na tabela.
+    """
+    def __init__(self, ids, tipos, L, apoios, inicio_apoios, carga_tipo, carga_a, carga_b, carga_valor,
+                 inicio_cargas, erros, carga_caso=None, combinacoes=None):
+        self.ids = ids
+        self.tipos = tipos
+        self.L = L
+        self.apoios = apoios
+        self.inicio_apoios = inicio_apoios
+        self.carga_tipo = carga_tipo
+        self.carga_a = carga_a
+        self.carga_b = carga_b
+        self.carga_valor = carga_valor
+        self.inicio_cargas = inicio_cargas
+        self.erros = erros
+        self.carga_caso = carga_caso if carga_caso is not None else [None] * len(carga_tipo)
+        self.combinacoes = combinacoes if combinacoes is not None else [None] * len(ids)
+        self._listas = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _montar_listas(self):
+        # Converte os arrays para listas do Python uma vez só, em vez de fatiá-los a cada viga. Em cada viga as
+        # cargas pontuais vêm antes das distribuídas (na ordem da planilha), de modo que cada grupo é uma fatia.
+        viga_carga = np.repeat(np.arange(len(self.ids)), np.diff(self.inicio_cargas))
+        ordem = np.lexsort((self.carga_tipo, viga_carga))
+        caso = [self.carga_caso[j] for j in ordem.tolist()]
+        cargas = [{"tipo": "pontual", "pos": a, "valor": v} if t == CARGA_PONTUAL else
+                  {"tipo": "distribuida", "inicio": a, "fim": b, "intensidade": v}
+                  for t, a, b, v in zip(self.carga_tipo[ordem].tolist(), self.carga_a[ordem].tolist(),
+                                        self.carga_b[ordem].tolist(), self.carga_valor[ordem].tolist())]
+        for carga, c in zip(cargas, caso):
+            if c is not None:
+                carga["caso"] = c
+        pontuais = np.bincount(viga_carga[self.carga_tipo == CARGA_PONTUAL], minlength=len(self.ids))
+        self._listas = (self.apoios.tolist(), self.inicio_apoios.tolist(), cargas, self.inicio_cargas.tolist(),
+                        (self.inicio_cargas[:-1] + pontuais).tolist(), self.L.tolist())
+        return self._listas
+
+    def viga(self, i):
+        """Retorna (tipo, L, apoios, cargas_p, cargas_d, combinacoes) no formato usado pelos cálculos."""
+        apoios, inicio_apoios, cargas, inicio_cargas, fim_pontuais, L = self._listas or self._montar_listas()
+        return (self.tipos[i], L[i], apoios[inicio_apoios[i]:inicio_apoios[i + 1]],
+                cargas[inicio_cargas[i]:fim_pontuais[i]], cargas[fim_pontuais[i]:inicio_cargas[i + 1]],
+                self.combinacoes[i])
+
+_DECODIFICADOR_JSON = json.JSONDecoder()
+
+def _carregar_json(valor, campo):
+    if isinstance(valor, (list, dict)):
+        return valor, None  # Já decodificado (entrada em JSON lines)
+    try:
+        # Textos vão direto ao decodificador, sem as conferências que json.loads repete a cada linha
+        return (_DECODIFICADOR_JSON.decode(valor) if type(valor) is str else json.loads(valor)), None
+    except json.JSONDecodeError:
+        return None, (f"O campo '{campo}' não é um JSON válido.", False)
+    except Exception as e:
+        return None, (str(e), True)
+
+def _carregar_coluna_json(valores, campo):
+    # Textos repetidos (a mesma viga em vários pavimentos) são decodificados uma vez só
+    lidos = {}
+    resultado = []
+    for valor in valores:
+        if type(valor) is str:
+            lido = lidos.get(valor)
+            if lido is None:
+                lido = lidos[valor] = _carregar_json(valor, campo)
+            resultado.append(lido)
+        else:
+            resultado.append(_carregar_json(valor, campo))
+    return resultado
+
+def _validar_estrutura_carga(c):
+    """Confere campos e tipos de uma carga; retorna (tipo, a, b, valor, caso) ou a mensagem de erro."""
+    if not isinstance(c, dict):
+        return "Cada carga em 'Cargas JSON' deve ser um objeto JSON."
+    caso = c.get("caso")
+    if caso is not None and not (isinstance(caso, str) and caso):
+        return "O 'caso' da carga deve ser um texto não vazio."
+    tipo = c.get("tipo")
+    if tipo == "pontual":
+        try:
+            pos, valor = c["pos"], c["valor"]
+        except KeyError:
+            return "Carga pontual deve ter 'pos' e 'valor'."
+        if not isinstance(pos, (int, float)) or not isinstance(valor, (int, float)):
+            return "Posição e valor da carga pontual devem ser números."
+        return CARGA_PONTUAL, pos, np.nan, valor, caso
+    if tipo == "distribuida":
+        try:
+            inicio, fim, intensidade = c["inicio"], c["fim"], c["intensidade"]
+        except KeyError:
+            return "Carga distribuída deve ter 'inicio', 'fim' e 'intensidade'."
+        if not (isinstance(inicio, (int, float)) and isinstance(fim, (int, float))
+                and isinstance(intensidade, (int, float))):
+            return "Início, fim e intensidade da carga distribuída devem ser números."
+        return CARGA_DISTRIBUIDA, inicio, fim, intensidade, caso
+    return "Tipo de carga inválido. Deve ser 'pontual' ou 'distribuida'."
+
+_CAMPOS_CARGA = {"pontual": ("pos", "pos", "valor"), "distribuida": ("inicio", "fim", "intensidade")}
+
+def _numeros(valores):
+    # Array float dos valores e máscara dos que não são números do JSON (textos numéricos não valem)
+    try:
+        array = np.array(valores)
+        if array.ndim == 1 and array.dtype.kind in "bif":
+            return array.astype(float), np.zeros(len(valores), dtype=bool)
+    except (ValueError, TypeError, OverflowError):
+        pass
+    numero = np.fromiter((isinstance(x, (int, float)) for x in valores), dtype=bool, count=len(valores))
+    return np.array([float(x) if ok else np.nan for x, ok in zip(valores, numero)], dtype=float), ~numero
+
+def _ler_cargas(cargas):
+    """Lê os campos de todas as cargas de uma vez: (tipo, a, b, valor, caso, erros).
+
+    erros mapeia a posição de cada carga com erro de estrutura na mensagem de
+    _validar_estrutura_carga, que só é chamada para essas cargas.
+    """
+    campos = [_CAMPOS_CARGA.get(c.get("tipo")) if isinstance(c, dict) else None for c in cargas]
+    valores = [(c.get(f[0]), c.get(f[1]), c.get(f[2])) if f else (None, None, None) for c, f in zip(cargas, campos)]
+    (a, a_invalido), (b, b_invalido), (valor, valor_invalido) = (_numeros([v[k] for v in valores]) for k in range(3))
+    casos = [c.get("caso") if isinstance(c, dict) else None for c in cargas]
+
+    suspeitas = set(np.flatnonzero(a_invalido | b_invalido | valor_invalido).tolist())
+    suspeitas.update(j for j, f in enumerate(campos) if f is None)
+    suspeitas.update(j for j, caso in enumerate(casos) if caso is not None and not (isinstance(caso, str) and caso))
+    erros = {}
+    for j in suspeitas:
+        carga = _validar_estrutura_carga(cargas[j])
+        if isinstance(carga, str):
+            erros[j] = carga
+    pontual = np.array([f is _CAMPOS_CARGA["pontual"] for f in campos], dtype=bool)
+    tipo = np.where(pontual, CARGA_PONTUAL, CARGA_DISTRIBUIDA).astype(np.int8)
+    return tipo, a, np.where(pontual, np.nan, b), valor, casos, erros
+
+def ler_tabela_vigas(df):
+    """Valida todas as linhas da aba 'Vigas' de uma vez e monta a TabelaVigas.
+
+    As colunas são lidas inteiras (sem iterrows) e as verificações de faixa
+    (comprimento, apoios e cargas dentro da viga) são feitas com NumPy sobre
+    todas as vigas. Cada linha recebe a primeira mensagem de erro na mesma
+    ordem de verificação de antes.
+    """
+    n = len(df)
+    erros = {}
+
+    def registrar(i, mensagem, inesperado=False):
+        erros.setdefault(i, (mensagem, inesperado))
+
+    # Tipo e comprimento
+    tipos_originais = df["Tipo"].tolist()
+    tipos = df["Tipo"].astype(str).str.lower().str.strip().tolist()
+    for i, tipo in enumerate(tipos):
+        if tipo not in TIPOS_VIGA:
+            registrar(i, f"Tipo de viga inválido '{tipos_originais[i]}'. Tipos aceitos: 'biapoiada', 'balanço', 'contínua'.")
+
+    L = np.full(n, np.nan)
+    for i, valor in enumerate(df["L (m)"].tolist()):
+        try:
+            L[i] = float(valor)
+        except ValueError as e:
+            registrar(i, str(e))
+        except Exception as e:
+            registrar(i, str(e), True)
+    for i in np.flatnonzero(L <= 0):
+        registrar(int(i), "O comprimento da viga (L) deve ser um valor positivo.")
+
+    # Apoios: só o JSON é lido linha a linha; tipos e faixa de todos os apoios são conferidos de uma vez
+    listas = []
+    for i, (lista, erro) in enumerate(_carregar_coluna_json(df["Apoios (m)"].tolist(), "Apoios (m)")):
+        if erro:
+            registrar(i, *erro)
+            lista = ()
+        elif not isinstance(lista, list):
+            registrar(i, "O campo 'Apoios (m)' deve ser uma lista JSON de números.")
+            lista = ()
+        listas.append(lista)
+    quantidades = np.fromiter(map(len, listas), dtype=np.intp, count=n)
+    inicio_apoios = np.concatenate([[0], np.cumsum(quantidades)]).astype(np.intp)
+    apoios, nao_numero = _numeros([x for lista in listas for x in lista])
+    viga_apoio = np.repeat(np.arange(n, dtype=np.intp), quantidades)
+    for i in np.unique(viga_apoio[nao_numero]).tolist():
+        registrar(i, "O campo 'Apoios (m)' deve ser uma lista JSON de números.")
+    fora = ~nao_numero & ~((apoios >= 0) & (apoios <= L[viga_apoio]))
+    for i in np.unique(viga_apoio[fora]).tolist():
+        registrar(i, "As posições dos apoios devem estar dentro do comprimento da viga (0 a L).")
+
+    # Cargas: só o JSON é lido linha a linha; estrutura e faixa de todas as cargas são conferidas de uma vez.
+    # O erro de cada viga é o da primeira carga com problema, de estrutura ou de faixa, como antes.
+    listas = []
+    for i, (cargas, erro) in enumerate(_carregar_coluna_json(df["Cargas JSON"].tolist(), "Cargas JSON")):
+        if i in erros:
+            cargas = ()
+        elif erro:
+            registrar(i, *erro)
+            cargas = ()
+        elif not isinstance(cargas, list):
+            registrar(i, "O campo 'Cargas JSON' deve ser uma lista JSON.")
+            cargas = ()
+        listas.append(cargas)
+    quantidades = np.fromiter(map(len, listas), dtype=np.intp, count=n)
+    inicio_cargas = np.concatenate([[0], np.cumsum(quantidades)]).astype(np.intp)
+    carga_tipo, carga_a, carga_b, carga_valor, carga_caso, erros_carga = _ler_cargas(
+        [c for cargas in listas for c in cargas])
+    viga_carga = np.repeat(np.arange(n, dtype=np.intp), quantidades)
+    ordem_carga = np.arange(len(carga_tipo), dtype=np.intp) - inicio_cargas[viga_carga]
+
+    erro_estrutura = {}
+    for j in sorted(erros_carga, reverse=True):
+        erro_estrutura[int(viga_carga[j])] = (int(ordem_carga[j]), erros_carga[j])
+    estrutura_ok = np.ones(len(carga_tipo), dtype=bool)
+    estrutura_ok[list(erros_carga)] = False
+    L_carga = L[viga_carga]
+    pontual = carga_tipo == CARGA_PONTUAL
+    fora_p = estrutura_ok & pontual & ~((carga_a >= 0) & (carga_a <= L_carga))
+    fora_d = estrutura_ok & ~pontual & ~((carga_a >= 0) & (carga_a < carga_b) & (carga_b <= L_carga))
+    erro_faixa = {}
+    # Percorre de trás para frente para ficar com a primeira carga fora da faixa de cada viga
+    for j in np.flatnonzero(fora_p | fora_d)[::-1]:
+        if fora_p[j]:
+            mensagem = "A posição da carga pontual deve estar dentro do comprimento da viga (0 a L)."
+        else:
+            mensagem = "O intervalo da carga distribuída deve estar dentro do comprimento da viga (0 a L) e 'inicio' < 'fim'."
+        erro_faixa[int(viga_carga[j])] = (int(ordem_carga[j]), mensagem)
+    for i in sorted(erro_estrutura.keys() | erro_faixa.keys()):
+        candidatos = [e for e in (erro_estrutura.get(i), erro_faixa.get(i)) if e]
+        registrar(i, min(candidatos)[1])
+
+    # Combinações (coluna opcional)
+    combinacoes = [None] * n
+    if COLUNA_COMBINACOES in df.columns:
+        for i, texto in enumerate(df[COLUNA_COMBINACOES].tolist()):
+            if i in erros or texto is None or (isinstance(texto, float) and np.isnan(texto)) or texto == "":
+                continue
+            valor, erro = _carregar_json(texto, COLUNA_COMBINACOES)
+            if erro:
+                registrar(i, *erro)
+                continue
+            casos = carga_caso[inicio_cargas[i]:inicio_cargas[i + 1]]
+            erro = _validar_combinacoes(valor, casos)
+            if erro:
+                registrar(i, erro)
+            else:
+                combinacoes[i] = valor
+
+    return TabelaVigas(df["ID"].tolist(), tipos, L, apoios, np.asarray(inicio_apoios, dtype=np.intp),
+                       carga_tipo, carga_a, carga_b, carga_valor, inicio_cargas, erros,
+                       carga_caso, combinacoes)
+
+def _validar_combinacoes(combinacoes, casos_cargas):
+    """Confere as combinações de uma viga; retorna a mensagem de erro ou None."""
+    if not (isinstance(combinacoes, dict) and combinacoes and all(
+            isinstance(nome, str) and isinstance(fatores, dict) and fatores
+            and all(isinstance(caso, str) and isinstance(f, (int, float)) for caso, f in fatores.items())
+            for nome, fatores in combinacoes.items())):
+        return f"O campo '{COLUNA_COMBINACOES}' deve ser um objeto JSON no formato {{\"combinação\": {{\"caso\": fator}}}}."
+    if None in casos_cargas:
+        return f"Com '{COLUNA_COMBINACOES}', toda carga deve indicar o seu 'caso'."
+    usados = {caso for fatores in combinacoes.values() for caso in fatores}
+    for caso in casos_cargas:
+        if caso not in usados:
+            return f"O caso '{caso}' não aparece em nenhuma combinação."
+    return None
+
+def calcular_reacoes(tipo, apoios, cargas_p, cargas_d):
+    carga_total = calcular_carga_total(cargas_p, cargas_d)
+    momento_total = calcular_momento_total(cargas_p, cargas_d)
+
+    if tipo == "biapoiada":
+        if len(apoios) != 2:
+            raise ValueError("Viga biapoiada deve ter exatamente 2 apoios.")
+        a, b = apoios[0], apoios[1]
+        span = b - a
+        if span <= 0:
+            raise ValueError("Para viga biapoiada, a posição do segundo apoio deve ser maior que a do primeiro.")
+        Rb = momento_total / span
+        Ra = carga_total - Rb
+        reacoes = [Ra, Rb]
+    elif tipo == "balanço":
+        if len(apoios) != 1:
+            raise ValueError("Viga em balanço deve ter exatamente 1 apoio.")
+        Ra = carga_total
+        reacoes = [Ra]
+    else:  # contínua
+        if len(apoios) < 2:
+            raise ValueError("Viga contínua deve ter no mínimo 2 apoios.")
+        reacoes = calcular_reacoes_viga_continua(apoios, cargas_p, cargas_d)
+    return reacoes, carga_total, momento_total
+
+def resolver_combinacoes(tipo, L, apoios, cargas_p, cargas_d, combinacoes):
+    """Resolve cada caso de carga uma vez e monta as combinações por superposição.
+
+    As reações e os diagramas de cada combinação são a soma dos de cada caso
+    multiplicados pelos fatores. Retorna a lista de resultados por combinação
+    e os DiagramaEsforcos correspondentes, na ordem de combinacoes.
+    """
+    casos = dict.fromkeys(caso for fatores in combinacoes.values() for caso in fatores)
+    # Todos os casos usam os pontos notáveis de todas as cargas, para combinar trecho a trecho
+    pontos = [c["pos"] for c in cargas_p] + [c["inicio"] for c in cargas_d] + [c["fim"] for c in cargas_d]
+    for caso in casos:
+        cp = [c for c in cargas_p if c["caso"] == caso]
+        cd = [c for c in cargas_d if c["caso"] == caso]
+        reacoes, carga_total, momento_total = calcular_reacoes(tipo, apoios, cp, cd)
+        casos[caso] = (np.asarray(reacoes, dtype=float), carga_total, momento_total,
+                       DiagramaEsforcos(L, apoios, reacoes, cp, cd, pontos))
+
+    resultados, diagramas = [], []
+    for nome, fatores in combinacoes.items():
+        partes = [(f, casos[caso]) for caso, f in fatores.items()]
+        diagrama = DiagramaEsforcos.combinar([d for _, (_, _, _, d) in partes], [f for f, _ in partes])
+        resultados.append({"nome": nome, "fatores": fatores,
+                           "reacoes": sum(f * r for f, (r, _, _, _) in partes).tolist(),
+                           "carga_total": sum(f * c for f, (_, c, _, _) in partes),
+                           "momento_total": sum(f * m for f, (_, _, m, _) in partes),
+                           "cortante_maxima": diagrama.cortante_maxima(), "momento_maximo": diagrama.momento_maximo()})
+        diagramas.append(diagrama)
+    return resultados, diagramas
+
+def _dados_combinacoes(resultados, diagramas, tolerancia=None):
+    # Envoltória entre as combinações; os máximos indicam a combinação que os governa
+    xs, V_min, V_max, M_min, M_max = envoltoria_esforcos(diagramas, tolerancia)
+    v = max(resultados, key=lambda r: abs(r["cortante_maxima"][0]))
+    m = max(resultados, key=lambda r: abs(r["momento_maximo"][0]))
+    return {"casos": list(dict.fromkeys(caso for r in resultados for caso in r["fatores"])),
+            "combinacoes": resultados,
+            "cortante_maxima": (*v["cortante_maxima"], v["nome"]),
+            "momento_maximo": (*m["momento_maximo"], m["nome"]),
+            "diagrama": {"x": xs.tolist(), "V": V_max.tolist(), "M": M_max.tolist(),
+                         "V_min": V_min.tolist(), "M_min": M_min.tolist()}}
+
+def gerar_graficos_viga(pasta_graficos, nome_base, L, apoios, cargas_p, cargas_d, diagrama, imagem=None):
+    """Salva as figuras do esquema e dos diagramas; diagrama é o dicionário de amostras do resultado.
+
+    imagem são as opções de opcoes_imagem (formato, dpi e qualidade); None
+    grava PNGs do matplotlib.
+    """
+    renderizador = renderizador_vigas()
+    extensao = FORMATOS_IMAGEM[(imagem or {}).get("formato", "png")]
+    cargas_p_formatadas = [(c['pos'], c['valor']) for c in cargas_p]
+    cargas_d_formatadas = [(c['inicio'], c['fim'], c['intensidade']) for c in cargas_d]
+
+    fig_esquema = os.path.join(pasta_graficos, f"{nome_base}_esquema{extensao}")
+    renderizador.salvar_esquema(fig_esquema, L, cargas_p_formatadas, cargas_d_formatadas, apoios, imagem)
+
+    fig_v = os.path.join(pasta_graficos, f"{nome_base}_cortante{extensao}")
+    renderizador.salvar_diagrama(fig_v, renderizador.cortante, diagrama["x"], diagrama["V"], diagrama.get("V_min"),
+                                 imagem)
+
+    fig_m = os.path.join(pasta_graficos, f"{nome_base}_momento{extensao}")
+    renderizador.salvar_diagrama(fig_m, renderizador.momento, diagrama["x"], diagrama["M"], diagrama.get("M_min"),
+                                 imagem)
+
+    return fig_esquema, fig_v, fig_m
+
+def adicionar_pagina_viga(pdf, resultado):
+    """Página da viga; sem figuras PNG, o esquema e os diagramas são desenhados como vetores.
+
+    Com combinações de carga, a página traz cada combinação e as envoltórias.
+    """
+    tipo, L, apoios = resultado["tipo"], resultado["L"], resultado["apoios"]
+    figuras = resultado["figuras"]
+
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, f"Relatório - Viga {resultado['id']}", ln=True, align='C')
+    if "igual_a" in resultado:
+        pdf.set_font("Arial", "I", 10)
+        pdf.cell(0, 6, f"Mesma definição da viga {resultado['igual_a']}.", ln=True, align='C')
+
+    if figuras:
+        _imagem_viga(pdf, resultado, figuras[0])
+    else:
+        desenhar_viga_vetorial(pdf, L, resultado["cargas_p"], resultado["cargas_d"], apoios)
+    pdf.ln(5)
+
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(0, 8, f"Tipo: {tipo.capitalize()}", ln=True)
+    pdf.cell(0, 8, f"Comprimento: {L} m", ln=True)
+    pdf.cell(0, 8, f"Apoios: {', '.join(map(str, apoios))}", ln=True)
+    if "combinacoes" in resultado:
+        _escrever_combinacoes(pdf, resultado)
+    else:
+        pdf.cell(0, 8, f"Carga Total Aplicada: {resultado['carga_total']:.2f} kN", ln=True)
+        pdf.cell(0, 8, f"Momento Total (na origem): {resultado['momento_total']:.2f} kNm", ln=True)
+
+        for i, r in enumerate(resultado["reacoes"]):
+            pdf.cell(0, 8, f"Reação no apoio {i+1} (R{chr(65+i)}): {r:.2f} kN", ln=True)
+
+        v_max, x_v = resultado["cortante_maxima"]
+        m_max, x_m = resultado["momento_maximo"]
+        pdf.cell(0, 8, f"Força Cortante Máxima: |V| = {abs(v_max):.2f} kN em x = {x_v:.2f} m", ln=True)
+        pdf.cell(0, 8, f"Momento Fletor Máximo: |M| = {abs(m_max):.2f} kNm em x = {x_m:.2f} m", ln=True)
+
+    pdf.ln(5)
+    if figuras:
+        _imagem_viga(pdf, resultado, figuras[1])
+        pdf.ln(5)
+        _imagem_viga(pdf, resultado, figuras[2])
+        return
+
+    diagrama = resultado["diagrama"]
+    prefixo = "Envoltória - " if "V_min" in diagrama else ""
+    for ys, ys_min, titulo, rotulo_y, cor in (
+            (diagrama["V"], diagrama.get("V_min"), "Força Cortante", "Força Cortante (kN)", COR_CORTANTE),
+            (diagrama["M"], diagrama.get("M_min"), "Momento Fletor", "Momento Fletor (kNm)", COR_MOMENTO)):
+        if pdf.get_y() + ALTURA_DIAGRAMA > pdf.page_break_trigger:
+            _continuar_pagina_viga(pdf, resultado)
+        desenhar_diagrama_vetorial(pdf, diagrama["x"], ys, prefixo + titulo, rotulo_y, cor, ys_min)
+
+def _continuar_pagina_viga(pdf, resultado):
+    # As figuras não trazem o ID (são compartilhadas pelo cache e pelas vigas iguais): a página nova o repete
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, f"Relatório - Viga {resultado['id']} (continuação)", ln=True, align='C')
+
+def _imagem_viga(pdf, resultado, caminho, largura=180):
+    with Image.open(caminho) as imagem:
+        altura = largura * imagem.height / imagem.width
+    if pdf.get_y() + altura > pdf.page_break_trigger:
+        _continuar_pagina_viga(pdf, resultado)
+    pdf.image(caminho, w=largura)
+
+def _escrever_combinacoes(pdf, resultado):
+    pdf.cell(0, 8, f"Casos de carga: {', '.join(resultado['casos'])}", ln=True)
+    for combinacao in resultado["combinacoes"]:
+        termos = " + ".join(f"{f:g}·{caso}" for caso, f in combinacao["fatores"].items())
+        pdf.set_font("Arial", "B", 11)
+        pdf.cell(0, 7, f"{combinacao['nome']} = {termos}", ln=True)
+        pdf.set_font("Arial", "", 10)
+        reacoes = ", ".join(f"R{chr(65+i)} = {r:.2f} kN" for i, r in enumerate(combinacao["reacoes"]))
+        pdf.multi_cell(0, 5, f"Carga total: {combinacao['carga_total']:.2f} kN; reações: {reacoes}")
+        v_max, x_v = combinacao["cortante_maxima"]
+        m_max, x_m = combinacao["momento_maximo"]
+        pdf.cell(0, 5, f"|V| máx = {abs(v_max):.2f} kN em x = {x_v:.2f} m; "
+                       f"|M| máx = {abs(m_max):.2f} kNm em x = {x_m:.2f} m", ln=True)
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, "Envoltória das combinações", ln=True)
+    pdf.set_font("Arial", "", 12)
+    for i, valores in enumerate(zip(*(c["reacoes"] for c in resultado["combinacoes"]))):
+        pdf.cell(0, 7, f"Reação no apoio {i+1} (R{chr(65+i)}): mín {min(valores):.2f} kN, máx {max(valores):.2f} kN", ln=True)
+    v_max, x_v, nome_v = resultado["cortante_maxima"]
+    m_max, x_m, nome_m = resultado["momento_maximo"]
+    pdf.cell(0, 7, f"Força Cortante Máxima: |V| = {abs(v_max):.2f} kN em x = {x_v:.2f} m ({nome_v})", ln=True)
+    pdf.cell(0, 7, f"Momento Fletor Máximo: |M| = {abs(m_max):.2f} kNm em x = {x_m:.2f} m ({nome_m})", ln=True)
+
+def adicionar_resumo_repetidas(pdf, grupos):
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Resumo de Vigas Iguais", ln=True, align='C')
+    pdf.set_font("Arial", "", 11)
+    pdf.multi_cell(0, 6, "As vigas de cada grupo têm o mesmo tipo, comprimento, apoios e cargas; "
+                         "cada grupo foi calculado e desenhado uma única vez.")
+    pdf.ln(5)
+
+    for grupo in grupos:
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 7, f"{grupo['tipo'].capitalize()}, L = {grupo['L']} m: {len(grupo['ids'])} vigas", ln=True)
+        pdf.set_font("Arial", "", 11)
+        pdf.multi_cell(0, 6, ", ".join(map(str, grupo["ids"])))
+        pdf.ln(3)
+
+def adicionar_resumo_erros(pdf, vigas_com_erro):
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 14)
+    pdf.cell(0, 10, "Resumo de Vigas com Erros de Leitura", ln=True, align='C')
+    pdf.ln(10)
+
+    for item_erro in vigas_com_erro:
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 7, f"Viga ID: {item_erro['id']}", ln=True)
+        pdf.set_font("Arial", "", 11)
+        pdf.set_text_color(220, 50, 50) # Cor vermelha para o erro
+        pdf.multi_cell(0, 6, f"Erro: {item_erro['erro']}")
+        pdf.set_text_color(0, 0, 0) # Restaura a cor preta
+        pdf.ln(5)
+
+def adicionar_rodape(pdf):
+    pdf.set_y(-45) # Posiciona o cursor perto do final da página
+    pdf.set_font("Arial", "I", 10)
+    pdf.cell(0, 10, "Desenvolvido por:", ln=True, align="L")
+    pdf.cell(0, 5, "Ana Caroline Souza Mendes,", ln=True, align="L")
+    pdf.cell(0, 5, "Eduardo do Carmo Szadkowski, ", ln=True, align="L")
+    pdf.cell(0, 5, "Jamim Suriel Fortaleza Silva e", ln=True, align="L")
+    pdf.cell(0, 5, "Nailton Caldeira dos Santos Filho", ln=True, align="L")
+
+def processar_viga(index, viga_id, definicao, pasta_graficos, cache=None, vetorial=False, imagem=None,
+                   tolerancia=None, perfil=False):
+    """Calcula e desenha uma viga já validada, também nos processos auxiliares; erros voltam no resultado."""
+    try:
+        tipo, L, apoios, cargas_p, cargas_d, combinacoes = definicao
+        tempos = {}
+        medir = (lambda nome: _medir(tempos, nome)) if perfil else (lambda nome: nullcontext())
+        resultado = {"id": viga_id, "tipo": tipo, "L": L, "apoios": apoios, "cargas_p": cargas_p, "cargas_d": cargas_d,
+                     "perfil": tempos}
+
+        with medir("cache"):
+            chave = (cache.chave(tipo, L, apoios, cargas_p, cargas_d, vetorial, combinacoes, imagem, tolerancia)
+                     if cache else None)
+            encontrado = cache.obter(chave) if cache else None
+        if encontrado:
+            dados, figuras = encontrado
+            resultado.update(dados)
+            resultado["figuras"] = figuras
+            return resultado
+
+        if combinacoes:
+            with medir("calculo"):
+                resultados, diagramas = resolver_combinacoes(tipo, L, apoios, cargas_p, cargas_d, combinacoes)
+            with medir("diagramas"):
+                dados = _dados_combinacoes(resultados, diagramas, tolerancia)
+        else:
+            with medir("calculo"):
+                reacoes, carga_total, momento_total = calcular_reacoes(tipo, apoios, cargas_p, cargas_d)
+            with medir("diagramas"):
+                diagrama = DiagramaEsforcos(L, apoios, reacoes, cargas_p, cargas_d)
+                xs, Vs, Ms = diagrama.amostras(tolerancia)
+                dados = {"reacoes": [float(r) for r in reacoes], "carga_total": carga_total, "momento_total": momento_total,
+                         "cortante_maxima": diagrama.cortante_maxima(), "momento_maximo": diagrama.momento_maximo(),
+                         "diagrama": {"x": xs.tolist(), "V": Vs.tolist(), "M": Ms.tolist()}}
+        # O nome dos arquivos usa o índice da linha para que IDs repetidos não se sobrescrevam
+        if vetorial:
+            figuras = ()
+        else:
+            with medir("figuras"):
+                figuras = gerar_graficos_viga(pasta_graficos, f"viga_{index}", L, apoios, cargas_p, cargas_d,
+                                              dados["diagrama"], imagem)
+        if cache:
+            with medir("cache"):
+                cache.gravar(chave, dados, figuras)
+        resultado.update(dados)
+        resultado["figuras"] = figuras
+        return resultado
+    except ValueError as ve:
+        return {"id": viga_id, "erro": str(ve), "inesperado": False}
+    except Exception as e:
+        return {"id": viga_id, "erro": str(e), "inesperado": True}
+
+def _iniciar_processo_auxiliar():
+    carregar_modulos()
+
+LIMITE_VIGAS_REPETIDAS = 200
+
+def _intercalar_erros(tabela, calculadas):
+    # Junta os erros de validação aos resultados calculados, na ordem da planilha
+    calculadas = iter(calculadas)
+    for i in range(len(tabela)):
+        if i in tabela.erros:
+            mensagem, inesperado = tabela.erros[i]
+            yield {"id": tabela.ids[i], "erro": mensagem, "inesperado": inesperado}
+        else:
+            yield next(calculadas)
+
+class VigasRepetidas:
+    """Vigas da planilha com a mesma definição (tipo, L, apoios, cargas e combinações).
+
+    Cada definição é calculada e desenhada uma única vez; as linhas repetidas
+    reaproveitam o resultado e as mesmas figuras, que o FPDF embute uma só vez.
+    Entre um bloco e outro, os resultados ficam guardados para até `limite`
+    definições (as usadas há mais tempo saem primeiro e seus PNGs temporários
+    são apagados); os grupos de IDs iguais são guardados todos, para o resumo
+    no fim do relatório.
+    """
+    def __init__(self, pasta_graficos, limite=LIMITE_VIGAS_REPETIDAS):
+        self.pasta_graficos = pasta_graficos
+        self.limite = limite
+        self.resultados = {}
+        self.grupos = {}
+
+    @staticmethod
+    def chave(definicao):
+        tipo, L, apoios, cargas_p, cargas_d, combinacoes = definicao
+        # A ordem das cargas na planilha não muda a viga
+        ordenar = lambda cargas: sorted(cargas, key=lambda c: json.dumps(c, sort_keys=True))
+        return CacheVigas.chave(tipo, L, apoios, ordenar(cargas_p), ordenar(cargas_d), combinacoes=combinacoes)
+
+    def registrar(self, chave, viga_id, definicao):
+        grupo = self.grupos.setdefault(chave, {"tipo": definicao[0], "L": definicao[1], "ids": []})
+        grupo["ids"].append(viga_id)
+
+    def obter(self, chave):
+        resultado = self.resultados.pop(chave, None)
+        if resultado is not None:
+            self.resultados[chave] = resultado  # Volta para o fim: usada mais recentemente
+        return resultado
+
+    def guardar(self, chave, resultado):
+        self.resultados[chave] = resultado
+        if "erro" in resultado:
+            self.grupos[chave]["erro"] = True  # Todas as vigas do grupo vão para o resumo de erros
+
+    def liberar(self):
+        """Descarta os resultados além do limite; só é chamado depois que as páginas deles foram gravadas."""
+        while len(self.resultados) > self.limite:
+            antigo = self.resultados.pop(next(iter(self.resultados)))
+            for figura in antigo.get("figuras", ()):
+                # Só os PNGs temporários são apagados (os do cache ficam)
+                if os.path.dirname(figura) == self.pasta_graficos and os.path.exists(figura):
+                    os.remove(figura)
+
+    def repetidas(self):
+        """Grupos com mais de uma viga calculada, na ordem em que aparecem na planilha."""
+        return [g for g in self.grupos.values() if len(g["ids"]) > 1 and not g.get("erro")]
+
+def _resultados_vigas(tabela, inicio, pasta_graficos, executor, processos, cache, vetorial, imagem, tolerancia,
+                      repetidas, perfil):
+    validas = [i for i in range(len(tabela)) if i not in tabela.erros]
+    definicoes = [tabela.viga(i) for i in validas]
+    chaves = [repetidas.chave(d) for d in definicoes]
+
+    # Só a primeira viga de cada definição ainda não calculada vai para o cálculo
+    repetidas.liberar()
+    do_bloco, novas = {}, {}
+    for n, chave in enumerate(chaves):
+        repetidas.registrar(chave, tabela.ids[validas[n]], definicoes[n])
+        if chave in do_bloco or chave in novas:
+            continue
+        anterior = repetidas.obter(chave)
+        if anterior is None:
+            novas[chave] = n
+        else:
+            do_bloco[chave] = anterior
+    # Índices globais (inicio + i) para que os arquivos temporários não colidam entre blocos
+    indices = [inicio + validas[n] for n in novas.values()]
+    ids = [tabela.ids[validas[n]] for n in novas.values()]
+    argumentos = (indices, ids, [definicoes[n] for n in novas.values()],
+                  repeat(pasta_graficos), repeat(cache), repeat(vetorial), repeat(imagem), repeat(tolerancia),
+                  repeat(perfil))
+    if executor is None or len(novas) <= 1:
+        calculadas = map(processar_viga, *argumentos)
+    else:
+        # executor.map devolve os resultados na ordem das linhas, mesmo que as vigas
+        # terminem fora de ordem nos processos auxiliares.
+        chunksize = max(1, len(novas) // (processos * 4))
+        calculadas = executor.map(processar_viga, *argumentos, chunksize=chunksize)
+    for chave, resultado in zip(novas, calculadas):
+        repetidas.guardar(chave, resultado)
+        do_bloco[chave] = resultado
+
+    # Só a linha que originou o cálculo usa o resultado como está; as demais, mesmo com o mesmo ID, recebem
+    # uma cópia sem perfil, para que o tempo da viga não seja contado de novo
+    return _intercalar_erros(tabela, (do_bloco[chave] if novas.get(chave) == n
+                                      else _resultado_da_viga(do_bloco[chave], tabela.ids[i])
+                                      for n, (i, chave) in enumerate(zip(validas, chaves))))
+
+def _resultado_da_viga(resultado, viga_id):
+    # Cópia do resultado calculado para outra linha de mesma definição
+    copia = dict(resultado, id=viga_id, perfil={})
+    if viga_id != resultado["id"]:
+        copia["igual_a"] = resultado["id"]
+    return copia
+
+def gerar_relatorio(blocos, pdf_path, ao_erro_viga=None, processos=1, cache=None, vetorial=False, perfil=None,
+                    imagem=None, ao_progresso=None, tolerancia=None, limpar_cache=True):
+    """Gera o relatório PDF sem a interface gráfica; retorna as vigas processadas e as vigas com erro."""
+    if isinstance(blocos, pd.DataFrame):
+        blocos = [blocos]
+    medir = perfil.etapa if perfil else (lambda nome: nullcontext())
+
+    with tempfile.TemporaryDirectory() as pasta_graficos, ExitStack() as pilha:
+        executor = None
+        if processos > 1:
+            executor = pilha.enter_context(
+                ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_processo_auxiliar))
+
+        pdf = PDFIncremental(pdf_path)
+        try:
+            pdf.set_auto_page_break(auto=True, margin=15)
+
+            vigas_com_erro = []
+            processed_beams_count = 0
+            inicio = 0
+            repetidas = VigasRepetidas(pasta_graficos)
+            for df in _medir_iteracao(blocos, medir, "leitura"):
+                with medir("validacao"):
+                    tabela = ler_tabela_vigas(df)
+                for n, resultado in enumerate(_resultados_vigas(tabela, inicio, pasta_graficos, executor, processos,
+                                                                cache, vetorial, imagem, tolerancia, repetidas,
+                                                                perfil is not None)):
+                    if ao_progresso:
+                        ao_progresso(inicio + n + 1)
+                    if "erro" in resultado:
+                        vigas_com_erro.append({"id": resultado["id"], "erro": resultado["erro"]})
+                        if ao_erro_viga:
+                            ao_erro_viga(resultado["id"], resultado["erro"], resultado["inesperado"])
+                        continue
+
+                    with _medir(resultado["perfil"], "montagem_pdf") if perfil else nullcontext():
+                        adicionar_pagina_viga(pdf, resultado)
+                    if perfil:
+                        perfil.registrar_viga(inicio + n, resultado)
+                    processed_beams_count += 1
+                inicio += len(tabela)
+
+            if processed_beams_count == 0 and not vigas_com_erro:
+                pdf.descartar()
+                return processed_beams_count, vigas_com_erro
+
+            with medir("gravacao_pdf"):
+                if repetidas.repetidas():
+                    adicionar_resumo_repetidas(pdf, repetidas.repetidas())
+                if vigas_com_erro:
+                    adicionar_resumo_erros(pdf, vigas_com_erro)
+
+                adicionar_rodape(pdf)
+                pdf.output()
+        except BaseException:
+            pdf.descartar()
+            raise
+
+    if cache and limpar_cache:
+        cache.limpar()
+
+    return processed_beams_count, vigas_com_erro
+
+def processar_arquivo(caminho):
+    perfil = PerfilExecucao() if perfil_ativado() else None
+    try:
+        with perfil.etapa("leitura") if perfil else nullcontext():
+            blocos = ler_vigas_em_blocos(caminho)
+    except ErroPlanilha as e:
+        messagebox.showerror(e.titulo, e.mensagem)
         return
 
     pdf_path = filedialog.asksaveasfilename(
@@ -173,200 +2046,476 @@ def processar_arquivo(caminho):
     if not pdf_path:
         return # Usuário cancelou o salvamento
 
-    with tempfile.TemporaryDirectory() as pasta_graficos:
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        
-        # <<< ALTERAÇÃO 1: INICIALIZA A LISTA PARA ARMAZENAR ERROS >>>
-        vigas_com_erro = []
+    # O relatório é gerado fora da thread do Tk, para a janela não travar; avisos e
+    # progresso chegam pela fila e são mostrados por _acompanhar_relatorio
+    eventos = queue.Queue()
 
-        processed_beams_count = 0 
-        for index, viga in df.iterrows():
-            viga_id = viga.get("ID", f"Linha {index+2}") 
-            try:
-                # 3. Validação dos tipos de dados e valores
-                tipo = str(viga["Tipo"]).lower().strip() 
-                if tipo not in ["biapoiada", "balanço", "contínua"]:
-                    raise ValueError(f"Tipo de viga inválido '{viga['Tipo']}'. Tipos aceitos: 'biapoiada', 'balanço', 'contínua'.")
+    def gerar():
+        try:
+            resultado = gerar_relatorio(blocos, pdf_path, ao_erro_viga=lambda *erro: eventos.put(("erro_viga", erro)),
+                                        cache=abrir_cache(), perfil=perfil,
+                                        ao_progresso=lambda vigas: eventos.put(("progresso", vigas)))
+            eventos.put(("fim", resultado))
+        except Exception as e:
+            eventos.put(("falha", e))
+
+    btn_executar.config(state=tk.DISABLED)
+    rotulo_progresso.config(text="Gerando relatório...")
+    rotulo_progresso.pack(before=btn_modelo)
+    barra_progresso.pack(pady=(0, 10), before=btn_modelo)
+    barra_progresso.start(15)
+    threading.Thread(target=gerar, daemon=True).start()
+    _acompanhar_relatorio(eventos, pdf_path, perfil)
+
+def _avisar_erro_viga(viga_id, mensagem, inesperado):
+    if inesperado:
+        messagebox.showwarning("Erro Inesperado", f"Erro inesperado ao processar a viga {viga_id}: {mensagem}\nEsta viga será ignorada.")
+    else:
+        messagebox.showwarning("Erro nos Dados da Viga", f"Erro na viga {viga_id}: {mensagem}\nEsta viga será ignorada.")
 
-                L = float(viga["L (m)"])
-                if L <= 0:
-                    raise ValueError("O comprimento da viga (L) deve ser um valor positivo.")
+def _acompanhar_relatorio(eventos, pdf_path, perfil):
+    while True:
+        try:
+            evento, dados = eventos.get_nowait()
+        except queue.Empty:
+            janela.after(100, _acompanhar_relatorio, eventos, pdf_path, perfil)
+            return
+        if evento == "progresso":
+            rotulo_progresso.config(text=f"Vigas lidas: {dados}")
+        elif evento == "erro_viga":
+            _avisar_erro_viga(*dados)
+        else:
+            break
 
-                try:
-                    apoios = json.loads(viga["Apoios (m)"])
-                    if not isinstance(apoios, list) or not all(isinstance(x, (int, float)) for x in apoios):
-                        raise ValueError("O campo 'Apoios (m)' deve ser uma lista JSON de números.")
-                    if not all(0 <= a <= L for a in apoios):
-                        raise ValueError("As posições dos apoios devem estar dentro do comprimento da viga (0 a L).")
-                except json.JSONDecodeError:
-                    raise ValueError("O campo 'Apoios (m)' não é um JSON válido.")
+    barra_progresso.stop()
+    barra_progresso.pack_forget()
+    rotulo_progresso.pack_forget()
+    btn_executar.config(state=tk.NORMAL)
 
-                try:
-                    cargas = json.loads(viga["Cargas JSON"])
-                    if not isinstance(cargas, list):
-                        raise ValueError("O campo 'Cargas JSON' deve ser uma lista JSON.")
-                    for c in cargas:
-                        if not isinstance(c, dict):
-                            raise ValueError("Cada carga em 'Cargas JSON' deve ser um objeto JSON.")
-                        if c.get("tipo") == "pontual":
-                            if not all(k in c for k in ["pos", "valor"]):
-                                raise ValueError("Carga pontual deve ter 'pos' e 'valor'.")
-                            if not isinstance(c["pos"], (int, float)) or not isinstance(c["valor"], (int, float)):
-                                raise ValueError("Posição e valor da carga pontual devem ser números.")
-                            if not (0 <= c["pos"] <= L):
-                                raise ValueError("A posição da carga pontual deve estar dentro do comprimento da viga (0 a L).")
-                        elif c.get("tipo") == "distribuida":
-                            if not all(k in c for k in ["inicio", "fim", "intensidade"]):
-                                raise ValueError("Carga distribuída deve ter 'inicio', 'fim' e 'intensidade'.")
-                            if not all(isinstance(c[k], (int, float)) for k in ["inicio", "fim", "intensidade"]):
-                                raise ValueError("Início, fim e intensidade da carga distribuída devem ser números.")
-                            if not (0 <= c["inicio"] < c["fim"] <= L):
-                                raise ValueError("O intervalo da carga distribuída deve estar dentro do comprimento da viga (0 a L) e 'inicio' < 'fim'.")
-                        else:
-                            raise ValueError("Tipo de carga inválido. Deve ser 'pontual' ou 'distribuida'.")
-                except json.JSONDecodeError:
-                    raise ValueError("O campo 'Cargas JSON' não é um JSON válido.")
-
-                cargas_p = [c for c in cargas if c["tipo"] == "pontual"]
-                cargas_d = [c for c in cargas if c["tipo"] == "distribuida"]
-
-                carga_total = calcular_carga_total(cargas_p, cargas_d)
-                momento_total = calcular_momento_total(cargas_p, cargas_d)
-
-                if tipo == "biapoiada":
-                    if len(apoios) != 2:
-                        raise ValueError("Viga biapoiada deve ter exatamente 2 apoios.")
-                    a, b = apoios[0], apoios[1]
-                    span = b - a
-                    if span <= 0:
-                        raise ValueError("Para viga biapoiada, a posição do segundo apoio deve ser maior que a do primeiro.")
-                    Rb = momento_total / span
-                    Ra = carga_total - Rb
-                    reacoes = [Ra, Rb]
-                elif tipo == "balanço":
-                    if len(apoios) != 1:
-                        raise ValueError("Viga em balanço deve ter exatamente 1 apoio.")
-                    Ra = carga_total 
-                    reacoes = [Ra]
-                elif tipo == "contínua":
-                    if len(apoios) < 2:
-                        raise ValueError("Viga contínua deve ter no mínimo 2 apoios.")
-                    reacoes = calcular_reacoes_viga_continua(carga_total, apoios)
-                else:
-                    continue
+    if evento == "falha":
+        messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar o arquivo PDF.\nVerifique se você tem permissão no local escolhido.\n\nErro técnico: {dados}")
+        return
+
+    processadas, vigas_com_erro = dados
+    if processadas == 0 and not vigas_com_erro:
+        messagebox.showwarning("Nenhuma Viga Processada", "Nenhuma viga pôde ser processada. Verifique se o arquivo contém dados.")
+        return
 
-                # Geração dos gráficos e PDF (código existente sem alteração)
-                cargas_p_formatadas = [(c['pos'], c['valor']) for c in cargas_p]
-                cargas_d_formatadas = [(c['inicio'], c['fim'], c['intensidade']) for c in cargas_d]
-
-                fig_esquema = os.path.join(pasta_graficos, f"{viga_id}_esquema.png")
-                plotar_viga(L, cargas_p_formatadas, cargas_d_formatadas, apoios)
-                plt.savefig(fig_esquema, bbox_inches='tight')
-                plt.close()
-
-                xs = np.linspace(0, L, 500)
-                Vs = [forca_cortante(x, reacoes, apoios, cargas_p, cargas_d) for x in xs]
-                Ms = [momento_fletor(x, reacoes, apoios, cargas_p, cargas_d) for x in xs]
-
-                fig_v = os.path.join(pasta_graficos, f"{viga_id}_cortante.png")
-                plt.figure(figsize=(8, 3))
-                plt.plot(xs, Vs, label="Força Cortante")
-                plt.axhline(0, color="black", lw=0.7)
-                plt.title(f"Força Cortante - {viga_id}")
-                plt.xlabel("Posição (m)", fontsize=10)
-                plt.ylabel("Força Cortante (kN)", fontsize=10)
-                plt.tight_layout()
-                plt.savefig(fig_v)
-                plt.close()
-
-                fig_m = os.path.join(pasta_graficos, f"{viga_id}_momento.png")
-                plt.figure(figsize=(8, 3))
-                plt.plot(xs, Ms, label="Momento Fletor", color="orange")
-                plt.axhline(0, color="black", lw=0.7)
-                plt.title(f"Momento Fletor - {viga_id}")
-                plt.xlabel("Posição (m)", fontsize=10)
-                plt.ylabel("Momento Fletor (kNm)", fontsize=10)
-                plt.tight_layout()
-                plt.savefig(fig_m)
-                plt.close()
-
-                pdf.add_page()
-                pdf.set_font("Arial", "B", 14)
-                pdf.cell(0, 10, f"Relatório - Viga {viga_id}", ln=True, align='C')
-
-                pdf.image(fig_esquema, w=180)
-                pdf.ln(5)
-
-                pdf.set_font("Arial", "", 12)
-                pdf.cell(0, 8, f"Tipo: {tipo.capitalize()}", ln=True)
-                pdf.cell(0, 8, f"Comprimento: {L} m", ln=True)
-                pdf.cell(0, 8, f"Apoios: {', '.join(map(str, apoios))}", ln=True)
-                pdf.cell(0, 8, f"Carga Total Aplicada: {carga_total:.2f} kN", ln=True)
-                pdf.cell(0, 8, f"Momento Total (na origem): {momento_total:.2f} kNm", ln=True)
-
-                for i, r in enumerate(reacoes):
-                    pdf.cell(0, 8, f"Reação no apoio {i+1} (R{chr(65+i)}): {r:.2f} kN", ln=True)
-
-                pdf.ln(5)
-                pdf.image(fig_v, w=180)
-                pdf.ln(5)
-                pdf.image(fig_m, w=180)
-                
-                processed_beams_count += 1
-
-            except ValueError as ve:
-                mensagem_erro = f"Erro na viga {viga_id}: {ve}"
-                messagebox.showwarning("Erro nos Dados da Viga", f"{mensagem_erro}\nEsta viga será ignorada.")
-                # <<< ALTERAÇÃO 2: ADICIONA O ERRO À LISTA >>>
-                vigas_com_erro.append({"id": viga_id, "erro": str(ve)})
-            
-            except Exception as e:
-                mensagem_erro = f"Erro inesperado ao processar a viga {viga_id}: {e}"
-                messagebox.showwarning("Erro Inesperado", f"{mensagem_erro}\nEsta viga será ignorada.")
-                # <<< ALTERAÇÃO 2: ADICIONA O ERRO À LISTA >>>
-                vigas_com_erro.append({"id": viga_id, "erro": str(e)})
-
-        if processed_beams_count == 0 and not vigas_com_erro:
-            messagebox.showwarning("Nenhuma Viga Processada", "Nenhuma viga pôde ser processada. Verifique se o arquivo contém dados.")
+    mensagem = f"Relatório gerado com sucesso em:\n{pdf_path}"
+    if perfil:
+        try:
+            perfil.gravar(caminho_perfil(pdf_path))
+            mensagem += f"\n\nPerfil de desempenho salvo em:\n{caminho_perfil(pdf_path)}"
+        except OSError as e:
+            mensagem += f"\n\nNão foi possível salvar o perfil de desempenho: {e}"
+    messagebox.showinfo("Sucesso", mensagem)
+
+# ============================ LINHA DE COMANDO ============================
+# Uso sem interface gráfica (servidores, cron):
+#   python "Calculadora de Vigas 3.0.py" entrada.xlsx saida.pdf
+# A entrada também pode ser .csv ou .jsonl com as mesmas colunas da aba 'Vigas'.
+# Cada viga ignorada gera uma linha JSON em stdout e o resumo vem na última linha.
+# --imagem png-indexado|jpeg e --dpi deixam o PDF menor e mais rápido de montar.
+# Com --perfil (ou CALCULADORA_VIGAS_PERFIL=1) o tempo e a memória por etapa e
+# por viga vão para <saida>_perfil.json, anunciado num evento "perfil".
+# Códigos de saída: 0 = tudo processado, 1 = relatório gerado com vigas ignoradas,
+# 2 = falha ao ler a planilha, nenhuma viga processada ou erro ao salvar o PDF.
+
+def _emitir_json(evento, **dados):
+    print(json.dumps({"evento": evento, **dados}, ensure_ascii=False, default=str), flush=True)
+
+def main_cli(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calculadora de Vigas 3.0 - geração de relatório sem interface gráfica.")
+    parser.add_argument("entrada", help="Planilha .xlsx com a aba 'Vigas', ou arquivo .csv/.jsonl com as mesmas colunas")
+    parser.add_argument("saida", help="Caminho do relatório PDF a ser gerado")
+    parser.add_argument("-p", "--processos", type=int, default=1,
+                        help="Número de processos para calcular e desenhar as vigas em paralelo (0 = todos os núcleos)")
+    parser.add_argument("--cache", metavar="PASTA", default=None,
+                        help="Pasta do cache de vigas já calculadas (padrão: pasta de cache do usuário)")
+    parser.add_argument("--cache-limite-mb", type=float, default=500,
+                        help="Tamanho máximo do cache em MB; as entradas menos usadas são removidas")
+    parser.add_argument("--sem-cache", action="store_true", help="Calcula e desenha todas as vigas sem usar o cache")
+    parser.add_argument("--figuras", choices=["png", "vetorial"], default="png",
+                        help="png: figuras do matplotlib; vetorial: esquema e diagramas desenhados direto no PDF")
+    parser.add_argument("--imagem", choices=list(FORMATOS_IMAGEM), default="png",
+                        help="Formato das figuras no modo png: png (RGBA), png-indexado (256 cores) ou jpeg")
+    parser.add_argument("--dpi", type=int, default=None, help="Resolução das figuras (padrão: 100 dpi)")
+    parser.add_argument("--qualidade-jpeg", type=int, default=QUALIDADE_JPEG,
+                        help="Qualidade das figuras em JPEG, de 1 a 95")
+    parser.add_argument("--bloco", type=int, default=200,
+                        help="Número de linhas lidas e processadas por vez; limita a memória usada")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_DIAGRAMA,
+                        help="Erro máximo do traçado de M entre amostras, como fração do |M| máximo")
+    parser.add_argument("--perfil", action="store_true",
+                        help="Mede tempo e memória por etapa e por viga e grava <saida>_perfil.json")
+    args = parser.parse_args(argv)
+    if args.dpi is not None and args.dpi <= 0:
+        parser.error("--dpi deve ser positivo")
+    if not 1 <= args.qualidade_jpeg <= 95:
+        parser.error("--qualidade-jpeg deve estar entre 1 e 95")
+    if args.tolerancia <= 0:
+        parser.error("--tolerancia deve ser positiva")
+
+    perfil = PerfilExecucao() if args.perfil or perfil_ativado() else None
+
+    try:
+        with perfil.etapa("leitura") if perfil else nullcontext():
+            blocos = ler_vigas_em_blocos(args.entrada, max(1, args.bloco))
+    except ErroPlanilha as e:
+        _emitir_json("erro_planilha", titulo=e.titulo, erro=e.mensagem)
+        return 2
+
+    def registrar_erro(viga_id, mensagem, inesperado):
+        _emitir_json("erro_viga", id=viga_id, erro=mensagem, inesperado=inesperado)
+
+    try:
+        processadas, vigas_com_erro = gerar_relatorio(blocos, args.saida, ao_erro_viga=registrar_erro,
+                                                   processos=args.processos or os.cpu_count() or 1,
+                                                   cache=None if args.sem_cache else abrir_cache(args.cache, args.cache_limite_mb),
+                                                   vetorial=args.figuras == "vetorial", perfil=perfil,
+                                                   imagem=opcoes_imagem(args.imagem, args.dpi, args.qualidade_jpeg),
+                                                   tolerancia=args.tolerancia)
+    except Exception as e:
+        _emitir_json("erro_saida", erro=str(e))
+        return 2
+
+    if perfil and processadas:
+        try:
+            resumo = perfil.gravar(caminho_perfil(args.saida))
+            _emitir_json("perfil", arquivo=caminho_perfil(args.saida), total_s=resumo["total_s"],
+                         vigas_mais_lentas=[v["id"] for v in resumo["vigas_mais_lentas"]])
+        except OSError as e:
+            _emitir_json("erro_perfil", erro=str(e))
+
+    if processadas == 0 and not vigas_com_erro:
+        _emitir_json("resumo", processadas=0, erros=0, saida=None)
+        return 2
+
+    _emitir_json("resumo", processadas=processadas, erros=len(vigas_com_erro), saida=args.saida)
+    return 1 if vigas_com_erro else 0
+
+# ============================ SERVIÇO LOCAL ============================
+# Modo servidor, para quem gera muitos relatórios seguidos:
+#   python "Calculadora de Vigas 3.0.py" servico [--porta 8765] [--trabalhadores N]
+# Os processos auxiliares sobem uma vez, já com pandas, matplotlib e FPDF
+# carregados e as figuras criadas, e atendem uma fila de trabalhos pela API HTTP
+# abaixo (só em 127.0.0.1). cliente_vigas.py é um cliente de linha de comando.
+#   POST   /trabalhos?formato=xlsx[&figuras=&imagem=&dpi=&qualidade_jpeg=&bloco=]
+#          corpo = conteúdo da planilha; responde 202 com o id do trabalho
+#   GET    /trabalhos              estado de todos os trabalhos
+#   GET    /trabalhos/<id>         estado: na_fila, processando, concluido ou erro
+#   GET    /trabalhos/<id>/pdf     relatório, quando concluído
+#   DELETE /trabalhos/<id>         tira o trabalho da fila e apaga os arquivos
+PORTA_SERVICO = 8765
+FORMATOS_PLANILHA = ("xlsx", "xlsm", "xls", "csv", "jsonl", "ndjson")
+TAMANHO_MAXIMO_PLANILHA_MB = 100
+LIMITE_TRABALHOS_CONCLUIDOS = 100
+
+def _aquecer_processo_servico():
+    # Roda uma vez em cada processo auxiliar, antes do primeiro trabalho: o primeiro
+    # savefig carrega fontes e backend, que ficam prontos para as vigas
+    _iniciar_processo_auxiliar()
+    renderizador = renderizador_vigas()
+    renderizador.salvar_diagrama(io.BytesIO(), renderizador.cortante, [0.0, 1.0], [0.0, 0.0])
+
+def executar_trabalho(entrada, saida, opcoes):
+    """Gera o relatório de um trabalho do serviço; roda num processo auxiliar."""
+    erros = []
+    try:
+        blocos = ler_vigas_em_blocos(entrada, opcoes["bloco"])
+    except ErroPlanilha as e:
+        return {"estado": "erro", "erro": f"{e.titulo}: {e.mensagem}"}
+
+    def registrar_erro(viga_id, mensagem, inesperado):
+        erros.append({"id": viga_id, "erro": mensagem, "inesperado": inesperado})
+
+    # O cache é compartilhado com os outros trabalhos: quem o limpa é o ServicoRelatorios
+    processadas, _ = gerar_relatorio(blocos, saida, ao_erro_viga=registrar_erro, cache=abrir_cache(),
+                                     vetorial=opcoes["vetorial"], imagem=opcoes["imagem"],
+                                     tolerancia=opcoes["tolerancia"], limpar_cache=False)
+    if processadas == 0 and not erros:
+        return {"estado": "erro", "erro": "Nenhuma viga pôde ser processada. Verifique se o arquivo contém dados."}
+    return {"estado": "concluido", "processadas": processadas, "erros": erros}
+
+def opcoes_trabalho(parametros):
+    """Opções de executar_trabalho a partir dos parâmetros da URL; lança ValueError se inválidas."""
+    valor = lambda nome, padrao=None: parametros.get(nome, [padrao])[-1]
+    figuras = valor("figuras", "png")
+    if figuras not in ("png", "vetorial"):
+        raise ValueError("figuras deve ser 'png' ou 'vetorial'.")
+    try:
+        dpi = int(valor("dpi")) if valor("dpi") else None
+        qualidade = int(valor("qualidade_jpeg", QUALIDADE_JPEG))
+        bloco = int(valor("bloco", 200))
+    except ValueError:
+        raise ValueError("dpi, qualidade_jpeg e bloco devem ser números inteiros.")
+    try:
+        tolerancia = float(valor("tolerancia", TOLERANCIA_DIAGRAMA))
+    except ValueError:
+        raise ValueError("tolerancia deve ser um número.")
+    if (dpi is not None and dpi <= 0) or not 1 <= qualidade <= 95 or bloco <= 0:
+        raise ValueError("dpi e bloco devem ser positivos e qualidade_jpeg deve estar entre 1 e 95.")
+    if not tolerancia > 0:
+        raise ValueError("tolerancia deve ser positiva.")
+    return {"vetorial": figuras == "vetorial", "bloco": bloco, "tolerancia": tolerancia,
+            "imagem": opcoes_imagem(valor("imagem", "png"), dpi, qualidade)}
+
+class ServicoRelatorios:
+    """Fila de trabalhos do serviço local, atendida por processos auxiliares já aquecidos.
+
+    Cada trabalho tem uma pasta com a planilha recebida e o relatório gerado.
+    Os trabalhos esperam numa fila própria e uma thread por processo auxiliar
+    entrega o próximo assim que o anterior termina (o executor marcaria como em
+    execução também os que só aguardam um processo livre). Os trabalhos
+    concluídos ficam disponíveis até serem apagados ou até passarem de
+    LIMITE_TRABALHOS_CONCLUIDOS, quando os mais antigos são removidos. Se um
+    processo auxiliar morrer, os trabalhos em andamento terminam com erro e o
+    executor é refeito para os que ainda estão na fila. O cache de vigas,
+    compartilhado entre os trabalhos, só é limpo quando nenhum está em
+    andamento, para não apagar entradas que algum deles esteja lendo.
+    """
+    def __init__(self, pasta, trabalhadores=1):
+        self.pasta = pasta
+        self.trabalhadores = trabalhadores
+        self.executor = self._novo_executor()
+        self.trabalhos = {}
+        self.fila = queue.Queue()
+        self._trava = threading.Lock()
+        self._encerrado = False
+        self._em_andamento = 0
+        self.cache = abrir_cache()
+        for _ in range(trabalhadores):
+            threading.Thread(target=self._atender, daemon=True).start()
+
+    def _novo_executor(self):
+        return ProcessPoolExecutor(max_workers=self.trabalhadores, initializer=_aquecer_processo_servico)
+
+    def _refazer_executor(self, quebrado):
+        # Chamado com a trava; várias threads podem encontrar o mesmo executor quebrado
+        if self.executor is quebrado and not self._encerrado:
+            quebrado.shutdown(wait=False)
+            self.executor = self._novo_executor()
+
+    def _atender(self):
+        while True:
+            item = self.fila.get()
+            if item is None:  # Aviso de encerrar()
+                return
+            trabalho_id, entrada, opcoes = item
+            with self._trava:
+                if self._encerrado:
+                    return
+                trabalho = self.trabalhos.get(trabalho_id)
+                if trabalho is None:  # Removido enquanto esperava na fila
+                    continue
+                argumentos = (executar_trabalho, entrada, trabalho["saida"], opcoes)
+                try:
+                    futuro = self.executor.submit(*argumentos)
+                except BrokenProcessPool:
+                    self._refazer_executor(self.executor)
+                    futuro = self.executor.submit(*argumentos)
+                trabalho["futuro"] = futuro
+                executor = self.executor
+                self._em_andamento += 1
+            try:
+                futuro.result()
+            except BrokenProcessPool:
+                # Um processo auxiliar morreu (falta de memória, sinal...): o trabalho fica com
+                # erro e os próximos vão para um executor novo
+                with self._trava:
+                    self._refazer_executor(executor)
+            except Exception:
+                pass  # O erro aparece no estado do trabalho
+            with self._trava:
+                self._em_andamento -= 1
+                # Com a trava, nenhum trabalho começa enquanto as entradas antigas são apagadas
+                if self._em_andamento == 0 and self.cache is not None and not self._encerrado:
+                    self.cache.limpar()
+
+    def aquecer(self):
+        """Sobe todos os processos auxiliares antes do primeiro trabalho."""
+        # O executor só cria um processo novo quando não há nenhum livre
+        for futuro in [self.executor.submit(os.getpid) for _ in range(self.trabalhadores)]:
+            futuro.result()
+
+    def enviar(self, conteudo, formato, opcoes):
+        trabalho_id = uuid.uuid4().hex
+        pasta = os.path.join(self.pasta, trabalho_id)
+        os.makedirs(pasta)
+        entrada = os.path.join(pasta, f"planilha.{formato}")
+        with open(entrada, "wb") as f:
+            f.write(conteudo)
+        saida = os.path.join(pasta, "relatorio.pdf")
+        with self._trava:
+            self._remover_antigos()
+            self.trabalhos[trabalho_id] = {"pasta": pasta, "saida": saida, "recebido": time.time()}
+        self.fila.put((trabalho_id, entrada, opcoes))
+        return self.estado(trabalho_id)
+
+    def estado(self, trabalho_id):
+        """Estado do trabalho como dicionário JSON; None se o id não existir."""
+        trabalho = self.trabalhos.get(trabalho_id)
+        if trabalho is None:
+            return None
+        futuro = trabalho.get("futuro")
+        estado = {"id": trabalho_id, "recebido": trabalho["recebido"]}
+        if futuro is None:
+            estado["estado"] = "na_fila"
+        elif not futuro.done():
+            estado["estado"] = "processando"
+        elif isinstance(futuro.exception(), BrokenProcessPool):
+            estado.update(estado="erro", erro="O processo auxiliar terminou de forma inesperada; envie o trabalho de novo.")
+        elif futuro.exception() is not None:
+            estado.update(estado="erro", erro=str(futuro.exception()))
+        else:
+            estado.update(futuro.result())
+        return estado
+
+    def todos(self):
+        return [self.estado(trabalho_id) for trabalho_id in list(self.trabalhos)]
+
+    def caminho_pdf(self, trabalho_id):
+        """Caminho do relatório, só depois que o trabalho for concluído."""
+        estado = self.estado(trabalho_id)
+        return self.trabalhos[trabalho_id]["saida"] if estado and estado["estado"] == "concluido" else None
+
+    def remover(self, trabalho_id):
+        """Tira o trabalho da fila (ou do serviço, se já concluído) e apaga os arquivos."""
+        with self._trava:
+            trabalho = self.trabalhos.pop(trabalho_id, None)
+        if trabalho is None:
+            return False
+        # Ainda gravando o PDF: a pasta é apagada quando o trabalho terminar
+        apagar = lambda _=None: shutil.rmtree(trabalho["pasta"], ignore_errors=True)
+        if "futuro" in trabalho:
+            trabalho["futuro"].add_done_callback(apagar)
+        else:
+            apagar()
+        return True
+
+    def _remover_antigos(self):
+        concluidos = [i for i, t in self.trabalhos.items() if "futuro" in t and t["futuro"].done()]
+        for trabalho_id in concluidos[:max(0, len(concluidos) - LIMITE_TRABALHOS_CONCLUIDOS + 1)]:
+            shutil.rmtree(self.trabalhos.pop(trabalho_id)["pasta"], ignore_errors=True)
+
+    def encerrar(self):
+        with self._trava:
+            self._encerrado = True
+        for _ in range(self.trabalhadores):
+            self.fila.put(None)
+        self.executor.shutdown(cancel_futures=True)
+
+class _ManipuladorServico(BaseHTTPRequestHandler):
+    servico = None  # ServicoRelatorios, definido em main_servico
+
+    def _responder_json(self, codigo, dados):
+        corpo = json.dumps(dados, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _rota(self):
+        # "/trabalhos/<id>/pdf" -> ["trabalhos", "<id>", "pdf"]
+        return [parte for parte in urlsplit(self.path).path.split("/") if parte]
+
+    def do_POST(self):
+        if self._rota() != ["trabalhos"]:
+            return self._responder_json(404, {"erro": "Rota não encontrada."})
+        parametros = parse_qs(urlsplit(self.path).query)
+        formato = parametros.get("formato", ["xlsx"])[-1].lower()
+        if formato not in FORMATOS_PLANILHA:
+            return self._responder_json(400, {"erro": f"formato deve ser um de: {', '.join(FORMATOS_PLANILHA)}."})
+        try:
+            opcoes = opcoes_trabalho(parametros)
+        except ValueError as e:
+            return self._responder_json(400, {"erro": str(e)})
+        try:
+            tamanho = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return self._responder_json(400, {"erro": "O cabeçalho Content-Length deve ser um número inteiro."})
+        if tamanho <= 0:
+            return self._responder_json(400, {"erro": "Envie o conteúdo da planilha no corpo da requisição."})
+        if tamanho > TAMANHO_MAXIMO_PLANILHA_MB * 1024 * 1024:
+            return self._responder_json(413, {"erro": f"A planilha passa de {TAMANHO_MAXIMO_PLANILHA_MB} MB."})
+        self._responder_json(202, self.servico.enviar(self.rfile.read(tamanho), formato, opcoes))
+
+    def do_GET(self):
+        rota = self._rota()
+        if rota == ["trabalhos"]:
+            return self._responder_json(200, self.servico.todos())
+        if len(rota) == 2 and rota[0] == "trabalhos":
+            estado = self.servico.estado(rota[1])
+            if estado is None:
+                return self._responder_json(404, {"erro": "Trabalho não encontrado."})
+            return self._responder_json(200, estado)
+        if len(rota) == 3 and rota[0] == "trabalhos" and rota[2] == "pdf":
+            estado = self.servico.estado(rota[1])
+            if estado is None:
+                return self._responder_json(404, {"erro": "Trabalho não encontrado."})
+            caminho = self.servico.caminho_pdf(rota[1])
+            if caminho is None:
+                return self._responder_json(409, {"erro": "O relatório ainda não está pronto.", **estado})
+            try:
+                arquivo = open(caminho, "rb")
+            except OSError:
+                return self._responder_json(404, {"erro": "O relatório foi removido."})
+            with arquivo:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/pdf")
+                self.send_header("Content-Length", str(os.fstat(arquivo.fileno()).st_size))
+                self.end_headers()
+                shutil.copyfileobj(arquivo, self.wfile)
             return
+        self._responder_json(404, {"erro": "Rota não encontrada."})
+
+    def do_DELETE(self):
+        rota = self._rota()
+        if len(rota) == 2 and rota[0] == "trabalhos" and self.servico.remover(rota[1]):
+            return self._responder_json(200, {"id": rota[1], "estado": "removido"})
+        self._responder_json(404, {"erro": "Trabalho não encontrado."})
+
+    def log_message(self, formato, *args):
+        _emitir_json("requisicao", cliente=self.client_address[0], linha=formato % args)
 
-        # <<< ALTERAÇÃO 3: ADICIONA A SEÇÃO DE ERROS AO PDF >>>
-        if vigas_com_erro:
-            # Adiciona uma nova página se já houver conteúdo
-            if processed_beams_count > 0:
-                pdf.add_page()
-            else: # Se nenhuma viga foi processada, cria a primeira página
-                pdf.add_page()
-
-            pdf.set_font("Arial", "B", 14)
-            pdf.cell(0, 10, "Resumo de Vigas com Erros de Leitura", ln=True, align='C')
-            pdf.ln(10)
-
-            for item_erro in vigas_com_erro:
-                pdf.set_font("Arial", "B", 12)
-                pdf.cell(0, 7, f"Viga ID: {item_erro['id']}", ln=True)
-                pdf.set_font("Arial", "", 11)
-                pdf.set_text_color(220, 50, 50) # Cor vermelha para o erro
-                pdf.multi_cell(0, 6, f"Erro: {item_erro['erro']}")
-                pdf.set_text_color(0, 0, 0) # Restaura a cor preta
-                pdf.ln(5)
-
-        # Adiciona o rodapé (movido para antes do output)
-        if pdf.page_no() > 0: # Garante que há uma página para adicionar o rodapé
-            pdf.set_y(-45) # Posiciona o cursor perto do final da página
-            pdf.set_font("Arial", "I", 10)
-            pdf.cell(0, 10, "Desenvolvido por:", ln=True, align="L")
-            pdf.cell(0, 5, "Ana Caroline Souza Mendes,", ln=True, align="L")
-            pdf.cell(0, 5, "Eduardo do Carmo Szadkowski, ", ln=True, align="L")
-            pdf.cell(0, 5, "Jamim Suriel Fortaleza Silva e", ln=True, align="L")
-            pdf.cell(0, 5, "Nailton Caldeira dos Santos Filho", ln=True, align="L")
+def _interromper_servico(*_):
+    raise KeyboardInterrupt
 
+def main_servico(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Calculadora de Vigas 3.0 - serviço local de relatórios.")
+    parser.add_argument("--porta", type=int, default=PORTA_SERVICO, help="Porta HTTP em 127.0.0.1")
+    parser.add_argument("--trabalhadores", type=int, default=0,
+                        help="Processos que geram relatórios ao mesmo tempo (0 = todos os núcleos)")
+    args = parser.parse_args(argv)
+
+    trabalhadores = args.trabalhadores or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory(prefix="servico-vigas-") as pasta:
+        servico = ServicoRelatorios(pasta, trabalhadores)
         try:
-            pdf.output(pdf_path)
-            messagebox.showinfo("Sucesso", f"Relatório gerado com sucesso em:\n{pdf_path}")
-        except Exception as e:
-            messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar o arquivo PDF.\nVerifique se você tem permissão no local escolhido.\n\nErro técnico: {e}")
+            servico.aquecer()
+            _ManipuladorServico.servico = servico
+            # SIGTERM (kill, gerenciadores de serviço) encerra como o Ctrl+C: apaga a pasta dos trabalhos
+            signal.signal(signal.SIGTERM, _interromper_servico)
+            try:
+                servidor = ThreadingHTTPServer(("127.0.0.1", args.porta), _ManipuladorServico)
+            except OSError as e:
+                _emitir_json("erro_servico", erro=str(e))
+                return 2
+            _emitir_json("servico", endereco=f"http://127.0.0.1:{servidor.server_address[1]}",
+                         trabalhadores=trabalhadores)
+            with servidor:
+                try:
+                    servidor.serve_forever()
+                except KeyboardInterrupt:
+                    pass
+        finally:
+            servico.encerrar()
+    return 0
 
 # ============================ UI COM ESTILO ============================
 
@@ -398,77 +2547,94 @@ def baixar_modelo():
     except Exception as e:
         messagebox.showerror("Erro", f"Erro ao copiar modelo:\n{e}")
 
-janela = tk.Tk()
-janela.title("Calculadora de Vigas 3.0 - Geração de Relatório")
-janela.geometry("750x400")
-janela.config(bg="#e5e8e1")
-try:
-    icon_path = resource_path("Logo.ico")
-    janela.iconbitmap(icon_path)
-except Exception as e:
-    print(f"Erro ao carregar ícone: {e}")
+def iniciar_interface():
+    global janela, entrada_arquivo, btn_executar, btn_modelo, barra_progresso, rotulo_progresso
 
-# Frame para agrupar imagem e título
-header_frame = tk.Frame(janela, bg="#e5e8e1")
-header_frame.pack(pady=10)
+    janela = tk.Tk()
+    janela.title("Calculadora de Vigas 3.0 - Geração de Relatório")
+    janela.geometry("750x400")
+    janela.config(bg="#e5e8e1")
+    try:
+        icon_path = resource_path("Logo.ico")
+        janela.iconbitmap(icon_path)
+    except Exception as e:
+        print(f"Erro ao carregar ícone: {e}")
 
-# Carrega e exibe a imagem
-try:
-    image_path = resource_path("Logo.png")
-    if os.path.exists(image_path):
-        original_image = Image.open(image_path)
-        resized_image = original_image.resize((150, 150))
-        tk_image = ImageTk.PhotoImage(resized_image)
-        img_label = tk.Label(header_frame, image=tk_image, bg="#e5e8e1")
-        img_label.image = tk_image #type:ignore
+    # Frame para agrupar imagem e título
+    header_frame = tk.Frame(janela, bg="#e5e8e1")
+    header_frame.pack(pady=10)
+
+    # Carrega e exibe a imagem
+    try:
+        image_path = resource_path("Logo.png")
+        if os.path.exists(image_path):
+            original_image = Image.open(image_path)
+            resized_image = original_image.resize((150, 150))
+            tk_image = ImageTk.PhotoImage(resized_image)
+            img_label = tk.Label(header_frame, image=tk_image, bg="#e5e8e1")
+            img_label.image = tk_image #type:ignore
+            img_label.pack(side=tk.LEFT, padx=(0, 10))
+        else:
+            raise FileNotFoundError(f"Arquivo não encontrado: {image_path}")
+    except Exception as e:
+        print(f"Erro ao carregar logo: {str(e)}")
+        # Placeholder se a imagem não carregar
+        img_label = tk.Label(header_frame, text="[LOGO]", bg="#e5e8e1", font=("Arial", 14))
         img_label.pack(side=tk.LEFT, padx=(0, 10))
-    else:
-        raise FileNotFoundError(f"Arquivo não encontrado: {image_path}")
-except Exception as e:
-    print(f"Erro ao carregar logo: {str(e)}")
-    # Placeholder se a imagem não carregar
-    img_label = tk.Label(header_frame, text="[LOGO]", bg="#e5e8e1", font=("Arial", 14))
-    img_label.pack(side=tk.LEFT, padx=(0, 10))
-
-# Título ao lado da imagem
-titulo = tk.Label(header_frame, text="Calculadora de Vigas 3.0",
-                font=("Segoe UI", 26, "bold"), bg="#e5e8e1")
-titulo.pack(side=tk.LEFT)
-
-# Frame principal para a área dos botões com cor diferente
-main_frame = tk.Frame(janela, bg="#e5e8e1",  # Cor mais escura para o fundo
-                    padx=20, pady=20)  # Padding interno
-main_frame.pack(fill=tk.BOTH, expand=True)  # Preenche todo o espaço disponível
-
-
-# Frame de input dentro do main_frame (herda a cor)
-frame_input = tk.Frame(main_frame, bg="#e5e8e1")
-frame_input.pack(pady=10)
-
-label_arquivo = tk.Label(frame_input, text="Arquivo Excel:",
-                        font=("Segoe UI", 12), bg="#e5e8e1")
-label_arquivo.grid(row=0, column=0, padx=5, sticky="e")
-
-entrada_arquivo = tk.Entry(frame_input, width=40, font=("Segoe UI", 10))
-entrada_arquivo.grid(row=0, column=1, padx=5)
-
-btn_procurar = tk.Button(frame_input, text="Procurar", command=selecionar_arquivo,
-                        bg="#007acc", fg="white", font=("Segoe UI", 10, "bold"))
-btn_procurar.grid(row=0, column=2, padx=5)
-
-btn_executar = tk.Button(main_frame, text="Gerar Relatório PDF", command=executar,
-                        bg="#28a745", fg="white", font=("Segoe UI", 12, "bold"), width=25)
-btn_executar.pack(pady=10)
-
-btn_modelo = tk.Button(main_frame, text="Baixar modelo de planilha Excel",
-                    command=baixar_modelo, bg="#ffc107", fg="black",
-                    font=("Segoe UI", 10, "bold"))
-btn_modelo.pack(pady=5)
-
-# Rodapé com fundo original
-rodape = tk.Label(janela,
-                text="Desenvolvido por: Ana Caroline Souza Mendes, Eduardo do Carmo Szadkowski, Jamim Suriel Fortaleza Silva e Nailton Caldeira dos Santos Filho",
-                font=("Segoe UI", 8), bg="#e5e8e1", fg="#777")
-rodape.pack(side="bottom", pady=10)
-
-janela.mainloop()
\ No newline at end of file
+
+    # Título ao lado da imagem
+    titulo = tk.Label(header_frame, text="Calculadora de Vigas 3.0",
+                    font=("Segoe UI", 26, "bold"), bg="#e5e8e1")
+    titulo.pack(side=tk.LEFT)
+
+    # Frame principal para a área dos botões com cor diferente
+    main_frame = tk.Frame(janela, bg="#e5e8e1",  # Cor mais escura para o fundo
+                        padx=20, pady=20)  # Padding interno
+    main_frame.pack(fill=tk.BOTH, expand=True)  # Preenche todo o espaço disponível
+
+
+    # Frame de input dentro do main_frame (herda a cor)
+    frame_input = tk.Frame(main_frame, bg="#e5e8e1")
+    frame_input.pack(pady=10)
+
+    label_arquivo = tk.Label(frame_input, text="Arquivo Excel:",
+                            font=("Segoe UI", 12), bg="#e5e8e1")
+    label_arquivo.grid(row=0, column=0, padx=5, sticky="e")
+
+    entrada_arquivo = tk.Entry(frame_input, width=40, font=("Segoe UI", 10))
+    entrada_arquivo.grid(row=0, column=1, padx=5)
+
+    btn_procurar = tk.Button(frame_input, text="Procurar", command=selecionar_arquivo,
+                            bg="#007acc", fg="white", font=("Segoe UI", 10, "bold"))
+    btn_procurar.grid(row=0, column=2, padx=5)
+
+    btn_executar = tk.Button(main_frame, text="Gerar Relatório PDF", command=executar,
+                            bg="#28a745", fg="white", font=("Segoe UI", 12, "bold"), width=25)
+    btn_executar.pack(pady=10)
+
+    btn_modelo = tk.Button(main_frame, text="Baixar modelo de planilha Excel",
+                        command=baixar_modelo, bg="#ffc107", fg="black",
+                        font=("Segoe UI", 10, "bold"))
+    btn_modelo.pack(pady=5)
+
+    # Só aparecem enquanto um relatório é gerado (ver processar_arquivo)
+    rotulo_progresso = tk.Label(main_frame, text="", font=("Segoe UI", 9), bg="#e5e8e1")
+    barra_progresso = ttk.Progressbar(main_frame, mode="indeterminate", length=300)
+
+    # Rodapé com fundo original
+    rodape = tk.Label(janela,
+                    text="Desenvolvido por: Ana Caroline Souza Mendes, Eduardo do Carmo Szadkowski, Jamim Suriel Fortaleza Silva e Nailton Caldeira dos Santos Filho",
+                    font=("Segoe UI", 8), bg="#e5e8e1", fg="#777")
+    rodape.pack(side="bottom", pady=10)
+
+    # A parte de cálculo e relatório carrega em segundo plano, com a janela já aberta
+    threading.Thread(target=carregar_modulos, daemon=True).start()
+    janela.mainloop()
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Necessário no executável do PyInstaller
+    if sys.argv[1:2] == ["servico"]:
+        sys.exit(main_servico(sys.argv[2:]))
+    if len(sys.argv) > 1:
+        sys.exit(main_cli())
+    iniciar_interface()
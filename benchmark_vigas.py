@@ -0,0 +1,167 @@
+"""Benchmark do relatório de vigas com planilhas sintéticas.
+
+Gera uma planilha 'Vigas' com o número de vigas e a densidade de cargas
+pedidos (misturando vigas biapoiadas, em balanço e contínuas) e gera o
+relatório com gerar_relatorio, como a linha de comando, medindo cada etapa com
+PerfilExecucao: leitura, validação, cálculo das reações, amostragem dos
+diagramas, desenho das figuras, cache, montagem do PDF e gravação. O resultado
+sai em JSON, para comparar versões.
+
+Uso:
+    python benchmark_vigas.py --vigas 200 --cargas 6 --saida resultado.json
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+
+CAMINHO_CALCULADORA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Calculadora de Vigas 3.0.py")
+
+def carregar_calculadora():
+    # O nome do arquivo tem espaços, então não dá para usar um import comum
+    if "calculadora_vigas" in sys.modules:
+        return sys.modules["calculadora_vigas"]
+    spec = importlib.util.spec_from_file_location("calculadora_vigas", CAMINHO_CALCULADORA)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules["calculadora_vigas"] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+# Com --processos, os processos auxiliares recebem processar_viga como calculadora_vigas.processar_viga.
+# No modo spawn (Windows e macOS) eles só reimportam este script, então o módulo é registrado aqui.
+carregar_calculadora()
+
+# ============================ PLANILHA SINTÉTICA ============================
+def gerar_viga_sintetica(rng, indice, cargas_por_viga):
+    tipo = ["biapoiada", "balanço", "contínua"][indice % 3]
+    L = rng.choice(range(4, 41)) / 2  # 2 m a 20 m, de meio em meio metro
+
+    if tipo == "biapoiada":
+        balanco = min(rng.choice([0.0, 0.0, 0.5, 1.0]), L / 4)
+        apoios = [balanco, L - balanco]
+    elif tipo == "balanço":
+        apoios = [0.0]
+    else:
+        vaos = rng.randint(2, 5)
+        apoios = [round(L * i / vaos, 2) for i in range(vaos + 1)]
+
+    cargas = []
+    for _ in range(cargas_por_viga):
+        if rng.random() < 0.5:
+            cargas.append({"tipo": "pontual", "valor": round(rng.uniform(1, 50), 1),
+                           "pos": round(rng.uniform(0, L), 1)})
+        else:
+            inicio, fim = sorted(round(rng.uniform(0, L), 1) for _ in range(2))
+            if fim <= inicio:
+                inicio, fim = 0.0, L
+            cargas.append({"tipo": "distribuida", "intensidade": round(rng.uniform(1, 20), 1),
+                           "inicio": inicio, "fim": fim})
+
+    return [f"V{indice + 1}", tipo, L, json.dumps(apoios), json.dumps(cargas)]
+
+def gerar_planilha_sintetica(caminho, vigas, cargas_por_viga, semente=0):
+    """Grava a planilha em .xlsx, .csv ou .jsonl, conforme a extensão de caminho."""
+    import openpyxl
+    import pandas as pd
+
+    rng = random.Random(semente)
+    colunas = ["ID", "Tipo", "L (m)", "Apoios (m)", "Cargas JSON"]
+    linhas = (gerar_viga_sintetica(rng, i, cargas_por_viga) for i in range(vigas))
+    extensao = os.path.splitext(caminho)[1].lower()
+
+    if extensao == ".xlsx":
+        livro = openpyxl.Workbook(write_only=True)
+        aba = livro.create_sheet("Vigas")
+        aba.append(colunas)
+        for linha in linhas:
+            aba.append(linha)
+        livro.save(caminho)
+    elif extensao == ".csv":
+        pd.DataFrame(list(linhas), columns=colunas).to_csv(caminho, index=False)
+    elif extensao == ".jsonl":
+        with open(caminho, "w", encoding="utf-8") as f:
+            for linha in linhas:
+                f.write(json.dumps(dict(zip(colunas, linha)), ensure_ascii=False) + "\n")
+    else:
+        raise ValueError(f"Formato de planilha não suportado: {extensao}")
+
+# ============================ MEDIÇÃO ============================
+def executar_benchmark(calc, caminho_planilha, pasta, processos=1, cache=None, vetorial=False, imagem=None,
+                       bloco=200, tolerancia=None):
+    """Gera o relatório com gerar_relatorio, o mesmo caminho da linha de comando, medido por PerfilExecucao."""
+    perfil = calc.PerfilExecucao()
+    caminho_pdf = os.path.join(pasta, "benchmark.pdf")
+    with perfil.etapa("leitura"):
+        blocos = calc.ler_vigas_em_blocos(caminho_planilha, bloco)
+    processadas, vigas_com_erro = calc.gerar_relatorio(blocos, caminho_pdf, processos=processos, cache=cache,
+                                                       vetorial=vetorial, perfil=perfil, imagem=imagem,
+                                                       tolerancia=tolerancia)
+    resumo = perfil.resumo()
+    return {
+        "vigas": processadas + len(vigas_com_erro),
+        "vigas_validas": processadas,
+        "etapas_s": {nome: etapa["tempo_s"] for nome, etapa in resumo["etapas"].items()},
+        "etapas": resumo["etapas"],
+        "total_s": resumo["total_s"],
+        "ms_por_viga": round(1000 * resumo["total_s"] / max(1, processadas), 3),
+        "pico_memoria_mb": resumo["pico_memoria_mb"],
+        "vigas_mais_lentas": resumo["vigas_mais_lentas"],
+        "tamanho_pdf_bytes": os.path.getsize(caminho_pdf) if os.path.exists(caminho_pdf) else 0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do relatório de vigas com planilhas sintéticas.")
+    parser.add_argument("--vigas", type=int, default=100, help="Número de vigas na planilha sintética")
+    parser.add_argument("--cargas", type=int, default=4, help="Número de cargas por viga")
+    parser.add_argument("--semente", type=int, default=0, help="Semente do gerador aleatório")
+    parser.add_argument("--formato", choices=["xlsx", "csv", "jsonl"], default="xlsx", help="Formato da planilha gerada")
+    parser.add_argument("--figuras", choices=["png", "vetorial"], default="png", help="Modo de desenho das figuras")
+    parser.add_argument("--imagem", choices=["png", "png-indexado", "jpeg"], default="png",
+                        help="Formato das figuras no modo png")
+    parser.add_argument("--dpi", type=int, default=None, help="Resolução das figuras")
+    parser.add_argument("--processos", type=int, default=1, help="Processos em paralelo (0 = todos os núcleos)")
+    parser.add_argument("--bloco", type=int, default=200, help="Linhas lidas e processadas por vez")
+    parser.add_argument("--tolerancia", type=float, help="Erro máximo do traçado de M (padrão: o da calculadora)")
+    parser.add_argument("--cache", metavar="PASTA", help="Usa o cache de vigas nesta pasta (padrão: sem cache)")
+    parser.add_argument("--planilha", help="Usa esta planilha em vez de gerar uma sintética")
+    parser.add_argument("--saida", help="Arquivo JSON com o resultado (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    calc = carregar_calculadora()
+    calc.carregar_modulos()  # A importação adiada não entra no tempo das etapas
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_planilha = args.planilha
+        if not caminho_planilha:
+            caminho_planilha = os.path.join(pasta, f"vigas_sinteticas.{args.formato}")
+            gerar_planilha_sintetica(caminho_planilha, args.vigas, args.cargas, args.semente)
+        resultado = executar_benchmark(calc, caminho_planilha, pasta,
+                                       processos=args.processos or os.cpu_count() or 1,
+                                       cache=calc.abrir_cache(args.cache) if args.cache else None,
+                                       vetorial=args.figuras == "vetorial",
+                                       imagem=calc.opcoes_imagem(args.imagem, args.dpi), bloco=max(1, args.bloco),
+                                       tolerancia=args.tolerancia)
+
+    relatorio = {
+        "parametros": {"vigas": args.vigas, "cargas_por_viga": args.cargas, "semente": args.semente,
+                       "formato": args.formato, "figuras": args.figuras, "imagem": args.imagem,
+                       "dpi": args.dpi, "processos": args.processos, "bloco": args.bloco, "tolerancia": args.tolerancia,
+                       "cache": args.cache, "planilha": args.planilha},
+        "versao_renderizacao": calc.VERSAO_RENDERIZACAO,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        **resultado,
+    }
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Cliente do serviço local de relatórios da Calculadora de Vigas.
+
+Envia a planilha para o serviço (iniciado com
+`python "Calculadora de Vigas 3.0.py" servico`), acompanha o trabalho na fila
+e baixa o PDF. Só usa a biblioteca padrão, então abre na hora: o pandas, o
+matplotlib e o FPDF já estão carregados nos processos do serviço. As mensagens
+e os códigos de saída são os mesmos da linha de comando da calculadora.
+
+Uso:
+    python cliente_vigas.py entrada.xlsx saida.pdf --imagem png-indexado
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+SERVIDOR_PADRAO = "http://127.0.0.1:8765"
+
+def _emitir_json(evento, **dados):
+    print(json.dumps({"evento": evento, **dados}, ensure_ascii=False, default=str), flush=True)
+
+def requisitar(url, metodo="GET", corpo=None):
+    """Resposta JSON do serviço; os erros HTTP também trazem um JSON com 'erro'."""
+    pedido = urllib.request.Request(url, data=corpo, method=metodo)
+    try:
+        with urllib.request.urlopen(pedido) as resposta:
+            return json.load(resposta)
+    except urllib.error.HTTPError as e:
+        with e:
+            return json.load(e)
+
+def enviar(servidor, caminho, parametros):
+    formato = os.path.splitext(caminho)[1].lstrip(".").lower()
+    consulta = urllib.parse.urlencode({"formato": formato, **parametros})
+    with open(caminho, "rb") as f:
+        return requisitar(f"{servidor}/trabalhos?{consulta}", "POST", f.read())
+
+def aguardar(servidor, trabalho_id, intervalo, timeout=None):
+    """Consulta o estado até o trabalho terminar; lança TimeoutError depois de timeout segundos."""
+    limite = None if timeout is None else time.monotonic() + timeout
+    while True:
+        estado = requisitar(f"{servidor}/trabalhos/{trabalho_id}")
+        if estado.get("estado") not in ("na_fila", "processando"):
+            return estado
+        if limite is not None and time.monotonic() >= limite:
+            raise TimeoutError(f"O trabalho {trabalho_id} não terminou em {timeout:g} s "
+                               f"(estado: {estado.get('estado')}).")
+        time.sleep(intervalo)
+
+def baixar(servidor, trabalho_id, destino):
+    with urllib.request.urlopen(f"{servidor}/trabalhos/{trabalho_id}/pdf") as resposta, \
+            open(destino, "wb") as f:
+        shutil.copyfileobj(resposta, f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera o relatório de vigas pelo serviço local.")
+    parser.add_argument("entrada", help="Planilha .xlsx com a aba 'Vigas', ou arquivo .csv/.jsonl com as mesmas colunas")
+    parser.add_argument("saida", help="Caminho do relatório PDF a ser gerado")
+    parser.add_argument("--servidor", default=SERVIDOR_PADRAO, help="Endereço do serviço")
+    parser.add_argument("--figuras", choices=["png", "vetorial"], default="png", help="Modo de desenho das figuras")
+    parser.add_argument("--imagem", choices=["png", "png-indexado", "jpeg"], default="png",
+                        help="Formato das figuras no modo png")
+    parser.add_argument("--dpi", type=int, help="Resolução das figuras")
+    parser.add_argument("--qualidade-jpeg", type=int, help="Qualidade das figuras em JPEG, de 1 a 95")
+    parser.add_argument("--tolerancia", type=float, help="Erro máximo do traçado de M, como fração do |M| máximo")
+    parser.add_argument("--intervalo", type=float, default=0.5, help="Segundos entre as consultas ao estado")
+    parser.add_argument("--timeout", type=float, help="Segundos máximos de espera pelo trabalho (padrão: sem limite)")
+    parser.add_argument("--manter", action="store_true", help="Não apaga o trabalho do serviço depois de baixar o PDF")
+    args = parser.parse_args(argv)
+
+    parametros = {"figuras": args.figuras, "imagem": args.imagem}
+    if args.dpi is not None:
+        parametros["dpi"] = args.dpi
+    if args.qualidade_jpeg is not None:
+        parametros["qualidade_jpeg"] = args.qualidade_jpeg
+    if args.tolerancia is not None:
+        parametros["tolerancia"] = args.tolerancia
+    servidor = args.servidor.rstrip("/")
+
+    try:
+        trabalho = enviar(servidor, args.entrada, parametros)
+        if "id" not in trabalho:
+            _emitir_json("erro_planilha", erro=trabalho.get("erro"))
+            return 2
+        _emitir_json("trabalho", id=trabalho["id"])
+        estado = aguardar(servidor, trabalho["id"], args.intervalo, args.timeout)
+
+        if estado.get("estado") != "concluido":
+            _emitir_json("erro_saida", erro=estado.get("erro", estado.get("estado")))
+            return 2
+        for erro in estado["erros"]:
+            _emitir_json("erro_viga", **erro)
+        baixar(servidor, trabalho["id"], args.saida)
+        if not args.manter:
+            requisitar(f"{servidor}/trabalhos/{trabalho['id']}", "DELETE")
+    except (OSError, ValueError) as e:
+        _emitir_json("erro_servico", erro=str(e))
+        return 2
+
+    _emitir_json("resumo", processadas=estado["processadas"], erros=len(estado["erros"]), saida=args.saida)
+    return 1 if estado["erros"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())